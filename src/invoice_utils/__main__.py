@@ -6,6 +6,8 @@ import invoice_utils.depends as di
 load_dotenv()
 import invoice_utils.config as config
 from invoice_utils.api import *
+from invoice_utils.fx import bnr_rates, default_refresher
+from invoice_utils.render import RenderQueueFullError, render_pool
 
 
 @asynccontextmanager
@@ -16,7 +18,16 @@ async def lifespan(_: FastAPI):
         raise Exception()
     if not repo.exists(config.INVOICE_UTILS_RULE_TEMPLATE_NAME):
         config.INVOICE_UTILS_RULE_TEMPLATE_NAME = config.DEFAULT_RULE_TEMPLATE_NAME
+    fx_refresher = default_refresher(bnr_rates()) if config.INVOICE_UTILS_FX_PREFETCH else None
+    if fx_refresher is not None:
+        fx_refresher.start()
+    render_pool().start()
+    invoice_jobs().start()
     yield
+    await invoice_jobs().stop()
+    await render_pool().stop()
+    if fx_refresher is not None:
+        await fx_refresher.stop()
 
 
 # API setup
@@ -28,3 +39,4 @@ app.include_router(invoices_router, prefix=API_PATH_PREFIX)
 
 app.add_exception_handler(InvoiceRequestInputError, input_error_handler)
 app.add_exception_handler(InvoiceRequestEmailError, email_error_handler)
+app.add_exception_handler(RenderQueueFullError, render_queue_full_handler)
@@ -1,7 +1,9 @@
 from ._template import router as template_router
 from ._templates import router as templates_router
-from ._errors import InvoiceRequestInputError, InvoiceRequestEmailError, input_error_handler, email_error_handler
-from ._invoices import router as invoices_router
+from ._errors import InvoiceRequestInputError, InvoiceRequestEmailError, input_error_handler, email_error_handler, \
+    render_queue_full_handler
+from ._invoices import router as invoices_router, invoice_jobs
 
 __all__ = ["template_router", "templates_router", "InvoiceRequestEmailError", "InvoiceRequestInputError",
-           "input_error_handler", "email_error_handler", "invoices_router"]
+           "input_error_handler", "email_error_handler", "render_queue_full_handler", "invoices_router",
+           "invoice_jobs"]
@@ -1,5 +1,6 @@
 from starlette.responses import JSONResponse
 
+from invoice_utils.render import RenderQueueFullError
 from ._request import InvoiceRequest
 
 
@@ -13,6 +14,11 @@ class InvoiceRequestEmailError(Exception):
         self.message = message
 
 
+class InvoiceJobError(Exception):
+    def __init__(self, message: str):
+        self.message = message
+
+
 def input_error_handler(_: InvoiceRequest, exc: InvoiceRequestInputError) -> JSONResponse:
     return JSONResponse(
         status_code=422,
@@ -23,3 +29,6 @@ def input_error_handler(_: InvoiceRequest, exc: InvoiceRequestInputError) -> JSO
 def email_error_handler(_: InvoiceRequest, exc: InvoiceRequestEmailError) -> JSONResponse:
     return JSONResponse(status_code=502, content={"message": f"{exc.message}"})
 
+
+def render_queue_full_handler(_: InvoiceRequest, exc: RenderQueueFullError) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"message": f"{exc.message}"}, headers={"Retry-After": "1"})
@@ -1,3 +1,5 @@
+import asyncio
+import json
 import os.path
 import smtplib
 from email.mime.application import MIMEApplication
@@ -8,51 +10,182 @@ from os.path import basename
 from logging import getLogger
 from pathlib import Path
 from email.mime.text import MIMEText
+from threading import Lock
+from typing import Optional
 
-from fastapi import HTTPException, Depends, APIRouter
+from fastapi import HTTPException, Depends, APIRouter, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, HTMLResponse
 from jinja2 import Environment, PackageLoader, select_autoescape
 
-from invoice_utils.api._errors import InvoiceRequestInputError, InvoiceRequestEmailError
+from invoice_utils.api._errors import InvoiceJobError, InvoiceRequestInputError, InvoiceRequestEmailError
+from invoice_utils.api._jobs import InvoiceJobQueue
 from invoice_utils.api._request import InvoiceRequest
-from invoice_utils.dal import Repository, Template
+from invoice_utils.dal import InvoiceJob, InvoiceJobStatus, Repository, Template
 import invoice_utils.depends as di
-from invoice_utils.engine import InvoicingEngine
+from invoice_utils.engine import InvalidRuleError, InvoicingEngine, LoggingEngineObserver
 
 import invoice_utils.config as config
-from invoice_utils.render import PdfInvoiceRenderer
+from invoice_utils.render import RenderQueueFullError, RenderTemplate, invoice_renderer, render_pool
 
 
 log = getLogger(__name__)
 router = APIRouter(prefix="/invoices")
+_engines: dict[str, tuple[list[dict], InvoicingEngine]] = {}
+_engines_lock = Lock()
+_RENDER_QUEUE_FULL_RETRY_SECONDS = 1
+_RENDER_QUEUE_FULL_ATTEMPTS = 30
 
 
 @router.post("/", status_code=201)
-def generate_invoice(request: InvoiceRequest, repo: Repository[str, Template] = Depends(di.template_repo)):
+async def generate_invoice(
+    request: InvoiceRequest,
+    http_request: Request,
+    response: Response,
+    async_job: bool = Query(False, alias="async"),
+    repo: Repository[str, Template] = Depends(di.template_repo),
+    job_repo: Repository[str, InvoiceJob] = Depends(di.invoice_job_repo),
+):
+    rule_template = await run_in_threadpool(_rule_template, request, repo)
+    if async_job:
+        if request.send_mail and not request.address:
+            raise InvoiceRequestInputError("Address was not provided but send_mail is set to True.")
+        job = await run_in_threadpool(
+            job_repo.create,
+            InvoiceJob(request=json.loads(request.json(exclude_none=True)), rule_template=rule_template),
+        )
+        _jobs.submit(job.id)
+        response.status_code = HTTPStatus.ACCEPTED
+        response.headers["Location"] = str(http_request.url_for("get_invoice_job", job_id=job.id))
+        return _job_status(job, http_request)
+    context, _ = await _generate_invoice(request, rule_template)
+    return context
+
+
+@router.post("/preview", response_class=HTMLResponse)
+async def preview_invoice(
+    request: InvoiceRequest,
+    template: RenderTemplate = RenderTemplate.BASE,
+    repo: Repository[str, Template] = Depends(di.template_repo),
+):
+    engine = _invoicing_engine(await run_in_threadpool(_rule_template, request, repo))
+    context = await run_in_threadpool(
+        engine.process, int(request.header.number), request.header.timestamp, request.items
+    )
+    html = await run_in_threadpool(invoice_renderer(template).render_html, context, inline_stylesheet=True)
+    return HTMLResponse(html)
+
+
+@router.get("/jobs/{job_id}")
+def get_invoice_job(
+    job_id: str, http_request: Request, job_repo: Repository[str, InvoiceJob] = Depends(di.invoice_job_repo)
+):
+    return _job_status(_invoice_job(job_id, job_repo), http_request)
+
+
+@router.get("/jobs/{job_id}/pdf")
+def download_invoice_job(job_id: str, job_repo: Repository[str, InvoiceJob] = Depends(di.invoice_job_repo)):
+    job = _invoice_job(job_id, job_repo)
+    if job.status != InvoiceJobStatus.DONE:
+        raise HTTPException(status_code=HTTPStatus.CONFLICT, detail="Invoice job is not done.")
+    if job.invoice_path is None or not os.path.isfile(job.invoice_path):
+        raise HTTPException(status_code=HTTPStatus.GONE, detail="Invoice file is no longer available.")
+    return FileResponse(job.invoice_path, media_type="application/pdf", filename=basename(job.invoice_path))
+
+
+def _rule_template(request: InvoiceRequest, repo: Repository[str, Template]) -> Template:
     found, rule_template = repo.get_by_key(config.INVOICE_UTILS_RULE_TEMPLATE_NAME)
     if request.rule_template_name:
         found, rule_template = repo.get_by_key(request.rule_template_name)
-    if not found:
+    if not found or rule_template is None:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="Rule Template does not exist.")
-    rules = rule_template.rules
-    engine = InvoicingEngine(rules)
-    context = engine.process(
-        int(request.header.number), request.header.timestamp, request.items
+    return rule_template
+
+
+def _invoice_job(job_id: str, job_repo: Repository[str, InvoiceJob]) -> InvoiceJob:
+    found, job = job_repo.get_by_key(job_id)
+    if not found or job is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Invoice job does not exist.")
+    return job
+
+
+def _job_status(job: InvoiceJob, http_request: Request) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "created": job.created,
+        "updated": job.updated,
+        "error": job.error,
+        "download": (
+            str(http_request.url_for("download_invoice_job", job_id=job.id))
+            if job.status == InvoiceJobStatus.DONE else None
+        ),
+    }
+
+
+async def _generate_invoice(
+    request: InvoiceRequest, rule_template: Template, persist: bool = False, job_id: Optional[str] = None
+):
+    engine = _invoicing_engine(rule_template)
+    context = await run_in_threadpool(
+        engine.process, int(request.header.number), request.header.timestamp, request.items
     )
-    invoice_content, invoice_path = _render_invoice(context, request)
-    _send_mail(request, invoice_content, invoice_path)
-    return context
-
-
-def _render_invoice(context, request):
+    invoice_content, invoice_path = await _render_invoice(context, request, persist, job_id)
+    await run_in_threadpool(_send_mail, request, invoice_content, invoice_path)
+    return context, invoice_path
+
+
+async def _run_invoice_job(job: InvoiceJob) -> str:
+    request = InvoiceRequest.parse_obj(job.request)
+    for attempt in range(_RENDER_QUEUE_FULL_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(_RENDER_QUEUE_FULL_RETRY_SECONDS)
+        try:
+            _, invoice_path = await _generate_invoice(request, job.rule_template, persist=True, job_id=job.id)
+            return str(invoice_path)
+        except RenderQueueFullError:
+            log.info("render queue full, retrying invoice job %s", job.id)
+        except HTTPException as exc:
+            raise InvoiceJobError(exc.detail) from exc
+        except (InvoiceRequestInputError, InvoiceRequestEmailError) as exc:
+            raise InvoiceJobError(exc.message) from exc
+    raise InvoiceJobError(f"Render queue stayed full after {_RENDER_QUEUE_FULL_ATTEMPTS} attempts.")
+
+
+_jobs = InvoiceJobQueue(
+    di.invoice_job_repo, _run_invoice_job, config.INVOICE_UTILS_JOB_WORKERS, config.INVOICE_UTILS_JOB_LEASE
+)
+
+
+def invoice_jobs() -> InvoiceJobQueue:
+    return _jobs
+
+
+def _invoicing_engine(rule_template: Template) -> InvoicingEngine:
+    with _engines_lock:
+        rules, engine = _engines.get(rule_template.name, (None, None))
+        if engine is None or rules != rule_template.rules:
+            try:
+                engine = InvoicingEngine(
+                    rule_template.rules,
+                    LoggingEngineObserver() if config.INVOICE_UTILS_ENGINE_TIMINGS else None
+                )
+            except InvalidRuleError as exc:
+                raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+            _engines[rule_template.name] = rule_template.rules, engine
+    return engine
+
+
+async def _render_invoice(context, request, persist=False, job_id=None):
     invoices_dir = Path(config.INVOICE_UTILS_INVOICE_DIR).absolute()
-    renderer = PdfInvoiceRenderer("invoice")
-    invoice_name = f"{request.header.timestamp:%Y%m%d}-{int(request.header.number):04}-invoice.pdf"
+    job_suffix = f"-{job_id}" if job_id is not None else ""
+    invoice_name = f"{request.header.timestamp:%Y%m%d}-{int(request.header.number):04}{job_suffix}-invoice.pdf"
     invoice_path = invoices_dir / invoice_name
     if not os.path.isdir(invoices_dir):
         raise HTTPException(status_code=507, detail="No local storage available for invoices")
     if not os.access(invoices_dir, os.W_OK):
         raise HTTPException(status_code=507, detail="Insufficient rights to store invoice")
-    invoice_content = renderer.render(context, str(invoice_path))
+    invoice_content = await render_pool().render("invoice", context, str(invoice_path), persist)
     return invoice_content, invoice_path
 
 
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import socket
+from logging import getLogger
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+
+from invoice_utils.api._errors import InvoiceJobError
+from invoice_utils.dal import InvoiceJob, InvoiceJobSqliteRepository, InvoiceJobStatus
+
+
+class InvoiceJobQueue:
+    def __init__(
+        self,
+        repo_factory: Callable[[], InvoiceJobSqliteRepository],
+        handler: Callable[[InvoiceJob], Awaitable[str]],
+        workers: int,
+        lease: float,
+    ):
+        self._log = getLogger(self.__class__.__name__)
+        self._repo_factory = repo_factory
+        self._handler = handler
+        self._workers = workers
+        self._lease = lease
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        self._running_queue()
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop, self._queue = None, None
+
+    def submit(self, job_id: str):
+        self._running_queue().put_nowait(job_id)
+
+    def _running_queue(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._queue is None:
+            self._loop, self._queue = loop, asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._work(self._queue)) for _ in range(max(1, self._workers))]
+            self._tasks.append(asyncio.create_task(self._requeue_expired(self._queue)))
+        return self._queue
+
+    async def _requeue_expired(self, queue: asyncio.Queue):
+        include_pending = True
+        while True:
+            try:
+                for job in await asyncio.to_thread(self._repo_factory().requeue, include_pending):
+                    queue.put_nowait(job.id)
+                include_pending = False
+            except Exception as exc:
+                self._log.error("can't requeue invoice jobs", exc_info=exc)
+            await asyncio.sleep(self._lease)
+
+    async def _work(self, queue: asyncio.Queue):
+        while True:
+            job_id = await queue.get()
+            try:
+                await self.run(job_id)
+            except Exception as exc:
+                self._log.error("can't update invoice job %s", job_id, exc_info=exc)
+            finally:
+                queue.task_done()
+
+    async def run(self, job_id: str):
+        repo, lease_id = self._repo_factory(), f"{self._owner}:{uuid4().hex[:8]}"
+        job = await asyncio.to_thread(repo.claim, job_id, lease_id, self._lease)
+        if job is None:
+            return
+        heartbeat = asyncio.create_task(self._heartbeat(repo, job_id, lease_id))
+        try:
+            job.invoice_path = await self._handler(job)
+            job.status = InvoiceJobStatus.DONE
+        except Exception as exc:
+            self._log.warning("invoice job %s failed", job_id, exc_info=exc)
+            job.status = InvoiceJobStatus.FAILED
+            job.error = exc.message if isinstance(exc, InvoiceJobError) else f"{type(exc).__name__}: {exc}"
+        finally:
+            heartbeat.cancel()
+        if not await asyncio.to_thread(repo.finish, job_id, lease_id, job):
+            self._log.warning("invoice job %s lost its lease, dropping its result", job_id)
+
+    async def _heartbeat(self, repo: InvoiceJobSqliteRepository, job_id: str, lease_id: str):
+        while True:
+            await asyncio.sleep(self._lease / 3)
+            try:
+                await asyncio.to_thread(repo.renew, job_id, lease_id, self._lease)
+            except Exception as exc:
+                self._log.warning("can't renew the lease of invoice job %s", job_id, exc_info=exc)
@@ -1,23 +1,20 @@
 import json
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from enum import StrEnum
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple, Optional
 
 import arrow
-from typer import run, Option, Argument
+from typer import run, echo, Exit, Option, Argument
 
-from invoice_utils.engine import InvoicingEngine
+from invoice_utils.engine import InvalidRuleError, InvoicingEngine
 from invoice_utils.models import InvoicedItem
-from invoice_utils.render import PdfInvoiceRenderer
+from invoice_utils.render import RenderTemplate, invoice_renderer
 
 
 _ROOT_DIR = Path(__file__).parent
-
-
-class RenderTemplate(StrEnum):
-    BASE = "invoice"
-    ROMANIAN = "invoice_ro-RO"
+_MAX_BATCH_SIZE = 32
 
 
 def _load_invoiced_items(obj: list) -> tuple[Any, datetime, list[InvoicedItem]]:
@@ -28,6 +25,71 @@ def _load_invoiced_items(obj: list) -> tuple[Any, datetime, list[InvoicedItem]]:
     return invoice_no, invoice_date, items
 
 
+def _invoice_label(position: int, obj: Any) -> Any:
+    if isinstance(obj, list) and obj:
+        return obj[0]
+    return f"#{position}"
+
+
+class _InvoiceOutcome(NamedTuple):
+    invoice: Any
+    path: Optional[Path] = None
+    error: Optional[str] = None
+    context: Optional[dict] = None
+
+
+class _InvoiceWorker:
+    def __init__(self, rules: list[dict], render_template: RenderTemplate, output_dir: Path, merge: bool = False):
+        self.__engine = InvoicingEngine(rules)
+        self.__renderer = invoice_renderer(render_template)
+        self.__output_dir = output_dir
+        self.__merge = merge
+
+    def __call__(self, batch: tuple[tuple[int, Any], ...]) -> list[_InvoiceOutcome]:
+        outcomes: list[_InvoiceOutcome] = []
+        pending = iter(batch)
+        while len(outcomes) < len(batch):
+            current: list[tuple[int, Any]] = []
+            try:
+                for context in self.__engine.process_many(self.__load(pending, current)):
+                    obj = current[-1][1]
+                    if self.__merge:
+                        outcomes.append(_InvoiceOutcome(obj[0], context=context))
+                    else:
+                        outcomes.append(self.__render(obj, context))
+            except Exception as exc:
+                outcomes.append(_InvoiceOutcome(_invoice_label(*current[-1]), error=f"{type(exc).__name__}: {exc}"))
+        return outcomes
+
+    @staticmethod
+    def __load(pending, current: list):
+        for position, obj in pending:
+            current.append((position, obj))
+            yield _load_invoiced_items(obj)
+
+    def __render(self, obj: list, context: dict) -> _InvoiceOutcome:
+        header = context["header"]
+        out_path = self.__output_dir / f"{header['date']:%Y%m%d}-{header['number']:04}-invoice.pdf"
+        try:
+            self.__renderer.render(context, str(out_path), persist=True)
+        except Exception as exc:
+            return _InvoiceOutcome(obj[0], error=f"{type(exc).__name__}: {exc}")
+        return _InvoiceOutcome(obj[0], path=out_path)
+
+
+_worker: Optional[_InvoiceWorker] = None
+
+
+def _init_worker(*args):
+    global _worker
+    _worker = _InvoiceWorker(*args)
+
+
+def _run_worker(batch: tuple[tuple[int, Any], ...]) -> list[_InvoiceOutcome]:
+    assert _worker is not None
+    return _worker(batch)
+
+
 def _make_invoices(
     invoices: Path = Argument(..., file_okay=True, exists=True, dir_okay=False, help="JSON file containing invoiced items"),
     invoice_template: Path = Option(
@@ -38,21 +100,62 @@ def _make_invoices(
         _ROOT_DIR.parent.parent / "invoices", "-o", "--output-dir", help="Directory where the invoice files will be generated",
         file_okay=False, dir_okay=True, exists=False
     ),
-    render_template: RenderTemplate = Option(RenderTemplate.BASE, "-r", "--render-template", help="Rendering template to use"),
+    render_template: RenderTemplate = Option(RenderTemplate.BASE.value, "-r", "--render-template", help="Rendering template to use"),
+    jobs: int = Option(1, "-j", "--jobs", min=1, help="Number of worker processes generating invoices"),
+    merge: bool = Option(
+        False, "-m", "--merge", help="Render all invoices into a single PDF file named after the invoices file"
+    ),
 ) -> int:
     with open(invoice_template, "r") as f:
-        engine = InvoicingEngine(json.load(f))
+        rules = json.load(f)
+    try:
+        InvoicingEngine(rules)
+    except InvalidRuleError as exc:
+        echo(f"invalid template {invoice_template}: {exc}", err=True)
+        raise Exit(code=1) from exc
     with open(invoices, "r") as f:
-        invoiced_items = map(_load_invoiced_items, json.load(f))
+        raw_invoices = json.load(f)
 
     output_dir.mkdir(0o755, True, True)
-    for invoice in invoiced_items:
-        context = engine.process(*invoice)
-        renderer = PdfInvoiceRenderer(render_template)
-        out_path = output_dir / f"{invoice[1]:%Y%m%d}-{invoice[0]:04}-invoice.pdf"
-        renderer.render(context, str(out_path), persist=True)
+    batch_size = max(1, min(_MAX_BATCH_SIZE, len(raw_invoices) // (jobs * 4)))
+    pending = enumerate(raw_invoices, start=1)
+    batches = iter(lambda: tuple(islice(pending, batch_size)), ())
+    contexts: list[dict] = []
+    worker_args = (rules, render_template, output_dir, merge)
+    if jobs == 1:
+        _init_worker(*worker_args)
+        failed = _report(map(_run_worker, batches), contexts)
+    else:
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=worker_args) as executor:
+            failed = _report(executor.map(_run_worker, batches), contexts)
+    if merge and contexts and not failed:
+        failed = _render_merged(render_template, contexts, output_dir / f"{invoices.stem}.pdf")
+    if failed:
+        echo(f"{failed} of {len(raw_invoices)} invoices failed", err=True)
+        raise Exit(code=1)
+    return 0
+
+
+def _report(outcomes, contexts: list[dict]) -> int:
+    failed = 0
+    for batch_outcomes in outcomes:
+        for outcome in batch_outcomes:
+            if outcome.error is not None:
+                failed += 1
+                echo(f"invoice {outcome.invoice}: {outcome.error}", err=True)
+            elif outcome.context is not None:
+                contexts.append(outcome.context)
+    return failed
+
+
+def _render_merged(render_template: RenderTemplate, contexts: list[dict], out_path: Path) -> int:
+    try:
+        invoice_renderer(render_template).render_many(contexts, str(out_path), persist=True)
+    except Exception as exc:
+        echo(f"merged invoices {out_path.name}: {type(exc).__name__}: {exc}", err=True)
+        return len(contexts)
     return 0
 
 
 def run_command():
-    run(_make_invoices)
\ No newline at end of file
+    run(_make_invoices)
@@ -14,6 +14,21 @@ DEFAULT_BODY_TEMPLATE_PACKAGE = "invoice_utils"
 DEFAULT_TEMPLATES_DIRECTORY = str(Path(__file__).parent / "templates")
 DEFAULT_INVOICE_DIR = "invoices"
 DEFAULT_RULE_TEMPLATE_NAME = "basic"
+DEFAULT_BNR_URL = "https://bnr.ro/files/xml/years"
+DEFAULT_FX_CACHE_DIR = "fx-cache"
+DEFAULT_FX_CACHE_TTL = 3600
+DEFAULT_FX_HTTP_POOL_SIZE = 10
+DEFAULT_FX_HTTP_CONNECT_TIMEOUT = 5.0
+DEFAULT_FX_HTTP_READ_TIMEOUT = 30.0
+DEFAULT_FX_HTTP_RETRIES = 3
+DEFAULT_FX_HTTP_BACKOFF = 0.5
+DEFAULT_FX_REFRESH_AT = "13:15"
+DEFAULT_FX_REFRESH_TIMEZONE = "Europe/Bucharest"
+DEFAULT_RENDER_WORKERS = max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", 1)))
+DEFAULT_RENDER_QUEUE_SIZE = 64
+DEFAULT_JOB_STORE = "invoice-jobs.sqlite3"
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_LEASE = 60.0
 
 INVOICE_UTILS_MAIL_HOST = os.getenv("INVOICE_UTILS_MAIL_HOST", DEFAULT_MAIL_HOST)
 INVOICE_UTILS_MAIL_PORT = os.getenv("INVOICE_UTILS_MAIL_PORT", DEFAULT_PORT)
@@ -30,3 +45,22 @@ INVOICE_UTILS_TEMPLATES_DIR = os.getenv(
     DEFAULT_TEMPLATES_DIRECTORY
 )
 INVOICE_UTILS_RULE_TEMPLATE_NAME = os.getenv("INVOICE_UTILS_RULE_TEMPLATE_NAME", DEFAULT_RULE_TEMPLATE_NAME)
+INVOICE_UTILS_ENGINE_TIMINGS = _str_to_bool(os.getenv("INVOICE_UTILS_ENGINE_TIMINGS", "False"))
+INVOICE_UTILS_BNR_URL = os.getenv("INVOICE_UTILS_BNR_URL", DEFAULT_BNR_URL)
+INVOICE_UTILS_FX_CACHE_DIR = os.getenv("INVOICE_UTILS_FX_CACHE_DIR", DEFAULT_FX_CACHE_DIR)
+INVOICE_UTILS_FX_CACHE_TTL = float(os.getenv("INVOICE_UTILS_FX_CACHE_TTL", DEFAULT_FX_CACHE_TTL))
+INVOICE_UTILS_FX_HTTP_POOL_SIZE = int(os.getenv("INVOICE_UTILS_FX_HTTP_POOL_SIZE", DEFAULT_FX_HTTP_POOL_SIZE))
+INVOICE_UTILS_FX_HTTP_CONNECT_TIMEOUT = float(
+    os.getenv("INVOICE_UTILS_FX_HTTP_CONNECT_TIMEOUT", DEFAULT_FX_HTTP_CONNECT_TIMEOUT)
+)
+INVOICE_UTILS_FX_HTTP_READ_TIMEOUT = float(os.getenv("INVOICE_UTILS_FX_HTTP_READ_TIMEOUT", DEFAULT_FX_HTTP_READ_TIMEOUT))
+INVOICE_UTILS_FX_HTTP_RETRIES = int(os.getenv("INVOICE_UTILS_FX_HTTP_RETRIES", DEFAULT_FX_HTTP_RETRIES))
+INVOICE_UTILS_FX_HTTP_BACKOFF = float(os.getenv("INVOICE_UTILS_FX_HTTP_BACKOFF", DEFAULT_FX_HTTP_BACKOFF))
+INVOICE_UTILS_FX_PREFETCH = _str_to_bool(os.getenv("INVOICE_UTILS_FX_PREFETCH", "True"))
+INVOICE_UTILS_FX_REFRESH_AT = os.getenv("INVOICE_UTILS_FX_REFRESH_AT", DEFAULT_FX_REFRESH_AT)
+INVOICE_UTILS_FX_REFRESH_TIMEZONE = os.getenv("INVOICE_UTILS_FX_REFRESH_TIMEZONE", DEFAULT_FX_REFRESH_TIMEZONE)
+INVOICE_UTILS_RENDER_WORKERS = int(os.getenv("INVOICE_UTILS_RENDER_WORKERS", DEFAULT_RENDER_WORKERS))
+INVOICE_UTILS_RENDER_QUEUE_SIZE = int(os.getenv("INVOICE_UTILS_RENDER_QUEUE_SIZE", DEFAULT_RENDER_QUEUE_SIZE))
+INVOICE_UTILS_JOB_STORE = os.getenv("INVOICE_UTILS_JOB_STORE", DEFAULT_JOB_STORE)
+INVOICE_UTILS_JOB_WORKERS = int(os.getenv("INVOICE_UTILS_JOB_WORKERS", DEFAULT_JOB_WORKERS))
+INVOICE_UTILS_JOB_LEASE = float(os.getenv("INVOICE_UTILS_JOB_LEASE", DEFAULT_JOB_LEASE))
@@ -1,6 +1,9 @@
-from ._model import Template
+from ._model import InvoiceJob, InvoiceJobStatus, Template
 from ._repo import Repository
 from ._file_repo import TemplateFileRepository
+from ._job_repo import InvoiceJobSqliteRepository
 
 
-__all__ = ["Repository", "Template", "TemplateFileRepository"]
+__all__ = [
+    "InvoiceJob", "InvoiceJobSqliteRepository", "InvoiceJobStatus", "Repository", "Template", "TemplateFileRepository"
+]
@@ -0,0 +1,140 @@
+import json
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from ._model import InvoiceJob, InvoiceJobStatus
+from ._repo import Repository
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS invoice_jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        request TEXT NOT NULL,
+        rule_template TEXT NOT NULL,
+        invoice_path TEXT,
+        error TEXT,
+        created TEXT NOT NULL,
+        updated TEXT NOT NULL,
+        owner TEXT,
+        lease_expires REAL
+    )
+"""
+_COLUMNS = "id, status, request, rule_template, invoice_path, error, created, updated"
+
+
+class InvoiceJobSqliteRepository(Repository[str, InvoiceJob]):
+    def __init__(self, path: Path, clock: Callable[[], float] = time.time):
+        self.__path = path
+        self.__clock = clock
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.__path, timeout=30)
+
+    @staticmethod
+    def _row(model: InvoiceJob) -> tuple:
+        return (
+            model.id, model.status.value, json.dumps(model.request), model.rule_template.json(),
+            model.invoice_path, model.error, model.created.isoformat(), model.updated.isoformat(),
+        )
+
+    @staticmethod
+    def _model(row: tuple) -> InvoiceJob:
+        return InvoiceJob.parse_obj({
+            "id": row[0],
+            "status": row[1],
+            "request": json.loads(row[2]),
+            "rule_template": json.loads(row[3]),
+            "invoice_path": row[4],
+            "error": row[5],
+            "created": row[6],
+            "updated": row[7],
+        })
+
+    def claim(self, key: str, owner: str, lease: float) -> Optional[InvoiceJob]:
+        with closing(self._connect()) as connection, connection:
+            claimed = connection.execute(
+                "UPDATE invoice_jobs SET status = ?, updated = ?, owner = ?, lease_expires = ? "
+                "WHERE id = ? AND status = ?",
+                (InvoiceJobStatus.RUNNING.value, datetime.now(timezone.utc).isoformat(), owner,
+                 self.__clock() + lease, key, InvoiceJobStatus.PENDING.value),
+            ).rowcount
+            if not claimed:
+                return None
+            row = connection.execute(f"SELECT {_COLUMNS} FROM invoice_jobs WHERE id = ?", (key,)).fetchone()
+        return self._model(row)
+
+    def renew(self, key: str, owner: str, lease: float) -> bool:
+        with closing(self._connect()) as connection, connection:
+            return connection.execute(
+                "UPDATE invoice_jobs SET lease_expires = ? WHERE id = ? AND owner = ? AND status = ?",
+                (self.__clock() + lease, key, owner, InvoiceJobStatus.RUNNING.value),
+            ).rowcount > 0
+
+    def finish(self, key: str, owner: str, model: InvoiceJob) -> bool:
+        model.updated = datetime.now(timezone.utc)
+        with closing(self._connect()) as connection, connection:
+            return connection.execute(
+                "UPDATE invoice_jobs SET status = ?, invoice_path = ?, error = ?, updated = ?, owner = NULL, "
+                "lease_expires = NULL WHERE id = ? AND owner = ? AND status = ?",
+                (model.status.value, model.invoice_path, model.error, model.updated.isoformat(), key, owner,
+                 InvoiceJobStatus.RUNNING.value),
+            ).rowcount > 0
+
+    def requeue(self, include_pending: bool = False) -> list[InvoiceJob]:
+        with closing(self._connect()) as connection, connection:
+            expired = connection.execute(
+                "UPDATE invoice_jobs SET status = ?, owner = NULL, lease_expires = NULL "
+                f"WHERE status = ? AND (lease_expires IS NULL OR lease_expires < ?) RETURNING {_COLUMNS}",
+                (InvoiceJobStatus.PENDING.value, InvoiceJobStatus.RUNNING.value, self.__clock()),
+            ).fetchall()
+            if include_pending:
+                return [
+                    self._model(row) for row in connection.execute(
+                        f"SELECT {_COLUMNS} FROM invoice_jobs WHERE status = ? ORDER BY created",
+                        (InvoiceJobStatus.PENDING.value,),
+                    )
+                ]
+            return [self._model(row) for row in sorted(expired, key=lambda row: row[6])]
+
+    def list(self) -> list[InvoiceJob]:
+        with closing(self._connect()) as connection:
+            return [
+                self._model(row)
+                for row in connection.execute(f"SELECT {_COLUMNS} FROM invoice_jobs ORDER BY created")
+            ]
+
+    def create(self, model: InvoiceJob) -> InvoiceJob:
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"INSERT INTO invoice_jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._row(model)
+            )
+        return model
+
+    def get_by_key(self, key: str) -> tuple[bool, Optional[InvoiceJob]]:
+        with closing(self._connect()) as connection:
+            row = connection.execute(f"SELECT {_COLUMNS} FROM invoice_jobs WHERE id = ?", (key,)).fetchone()
+        return row is not None, self._model(row) if row is not None else None
+
+    def delete(self, key: str) -> bool:
+        with closing(self._connect()) as connection, connection:
+            return connection.execute("DELETE FROM invoice_jobs WHERE id = ?", (key,)).rowcount > 0
+
+    def exists(self, key: str) -> bool:
+        return self.get_by_key(key)[0]
+
+    def update(self, key: str, model: InvoiceJob) -> InvoiceJob:
+        model.updated = datetime.now(timezone.utc)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "UPDATE invoice_jobs SET id = ?, status = ?, request = ?, rule_template = ?, invoice_path = ?, "
+                "error = ?, created = ?, updated = ? WHERE id = ?",
+                (*self._row(model), key),
+            )
+        return model
@@ -1,6 +1,29 @@
-from pydantic import BaseModel
+from datetime import datetime, timezone
+from enum import StrEnum
+from typing import Optional
+from uuid import uuid4
+
+from pydantic import BaseModel, Field
 
 
 class Template(BaseModel):
     name: str
     rules: list[dict]
+
+
+class InvoiceJobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class InvoiceJob(BaseModel):
+    id: str = Field(default_factory=lambda: uuid4().hex)
+    status: InvoiceJobStatus = InvoiceJobStatus.PENDING
+    request: dict
+    rule_template: Template
+    invoice_path: Optional[str] = None
+    error: Optional[str] = None
+    created: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -1,8 +1,21 @@
 from pathlib import Path
+from threading import Lock
 
-from invoice_utils.dal import TemplateFileRepository
+import invoice_utils.config as config
+from invoice_utils.dal import InvoiceJobSqliteRepository, TemplateFileRepository
 from invoice_utils.config import DEFAULT_TEMPLATES_DIRECTORY
 
+_job_repos: dict[Path, InvoiceJobSqliteRepository] = {}
+_job_repos_lock = Lock()
+
 
 def template_repo():
     return TemplateFileRepository(Path(DEFAULT_TEMPLATES_DIRECTORY))
+
+
+def invoice_job_repo() -> InvoiceJobSqliteRepository:
+    path = Path(config.INVOICE_UTILS_JOB_STORE)
+    with _job_repos_lock:
+        if path not in _job_repos or not path.exists():
+            _job_repos[path] = InvoiceJobSqliteRepository(path)
+        return _job_repos[path]
@@ -1,4 +1,11 @@
-from invoice_utils.engine._engine import InvoicingEngine
-from invoice_utils.engine._errors import InvoicingInputError
+from invoice_utils.engine._engine import InvoiceStream, InvoicingEngine
+from invoice_utils.engine._errors import (
+    InvalidFxRateRuleError, InvalidItemOperationError, InvalidRuleError, InvoicingInputError
+)
+from invoice_utils.engine._observer import EngineObserver, LoggingEngineObserver
+from invoice_utils.engine._operations import item_operations, register_item_operation
 
-__all__ = ["InvoicingEngine", "InvoicingInputError"]
\ No newline at end of file
+__all__ = [
+    "EngineObserver", "InvalidFxRateRuleError", "InvalidItemOperationError", "InvalidRuleError", "InvoiceStream",
+    "InvoicingEngine", "InvoicingInputError", "LoggingEngineObserver", "item_operations", "register_item_operation",
+]
\ No newline at end of file
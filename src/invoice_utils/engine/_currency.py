@@ -1,90 +1,89 @@
-from datetime import datetime, timedelta
-from decimal import Decimal
+from datetime import datetime
 from logging import getLogger
-from typing import Callable
+from typing import Callable, Optional
 from xml.etree import ElementTree as Etree
 
-import requests
+from invoice_utils.fx import DEFAULT_LOOKBACK_DAYS, FxRateProvider, InvalidFxProviderError, fx_provider
 
+from ._errors import InvalidFxRateRuleError
 
-class BaseCurrencyRule(Callable):
-    def __init__(self, invoice: dict):
-        self._invoice = invoice
 
-    def _set_currency_info(self, main, rates):
-        currency_info: dict = self._invoice["header"].get("currency", {})
+class BaseCurrencyRule(Callable):
+    @staticmethod
+    def _set_currency_info(invoice: dict, main, rates):
+        currency_info: dict = invoice["header"].get("currency", {})
         currency_info.update({
             "main": main,
             "exchangeRates": rates,
         })
-        self._invoice["header"]["currency"] = currency_info
+        invoice["header"]["currency"] = currency_info
 
 
 class CurrencyRule(BaseCurrencyRule):
-    def __init__(self, invoice: dict, rules: list[dict]):
-        super().__init__(invoice)
-        self._rules = rules
-
-    def __call__(self):
+    def __init__(self, rules: list[dict]):
         rule = next(
-            filter(lambda r: r.get("type") == "currency", self._rules), None
+            filter(lambda r: r.get("type") == "currency", rules), None
         )
-        if rule is None:
+        self._currency = None
+        if rule is not None:
+            secondary_currencies = rule.get("secondary", [])
+            self._currency = (
+                rule.get("main", {}).get("symbol", ""),
+                {
+                    currency.get("symbol", f"currency-{index}"): currency.get("rate", 1.0)
+                    for index, currency in enumerate(secondary_currencies)
+                },
+            )
+
+    def __call__(self, invoice: dict, invoice_no: int, invoice_date: datetime, rates_cache: dict):
+        if self._currency is None:
             return
 
-        main_currency = rule.get("main", {}).get("symbol", "")
-        secondary_currencies = rule.get("secondary", [])
-        exchange_rates = {
-            currency.get("symbol", f"currency-{index}"): currency.get("rate", 1.0)
-            for index, currency in enumerate(secondary_currencies)
-        }
-        self._set_currency_info(main_currency, exchange_rates)
+        main_currency, exchange_rates = self._currency
+        self._set_currency_info(invoice, main_currency, dict(exchange_rates))
 
 
-class BnrFxRateRule(BaseCurrencyRule):
-    def __init__(self, invoice: dict, rules: list[dict], invoice_date: datetime):
-        super().__init__(invoice)
+class FxRateRule(BaseCurrencyRule):
+    def __init__(self, rules: list[dict]):
         self._log = getLogger(self.__class__.__name__)
-        self._invoice = invoice
-        self._rules = rules
-        days_from_friday = invoice_date.weekday() - 4
-        self.__invoice_date = (
-            invoice_date - timedelta(days=days_from_friday)
-            if days_from_friday > 0
-            else invoice_date
-        )
-
-    def __call__(self):
-        bnr_rule = next(
-            filter(lambda rule: rule.get("type", "") == "bnr-fx-rate", self._rules),
+        fx_rule = next(
+            filter(lambda rule: rule.get("type", "") in ("fx-rate", "bnr-fx-rate"), rules),
             None
         )
-        if bnr_rule is None:
+        self._symbol: Optional[str] = None if fx_rule is None else fx_rule.get("symbol", "RON")
+        self._provider: Optional[FxRateProvider] = None
+        if fx_rule is not None:
+            try:
+                self._provider = fx_provider(
+                    fx_rule.get("providers", [{"type": "bnr"}]), fx_rule.get("lookbackDays", DEFAULT_LOOKBACK_DAYS)
+                )
+            except InvalidFxProviderError as exc:
+                raise InvalidFxRateRuleError(fx_rule, str(exc)) from exc
+
+    def __call__(self, invoice: dict, invoice_no: int, invoice_date: datetime, rates_cache: dict):
+        symbol, provider = self._symbol, self._provider
+        if symbol is None or provider is None:
             return
-        rates = {}
-        symbol = bnr_rule.get("symbol", "RON")
-        try:
-            res = requests.get(
-                f"https://bnr.ro/files/xml/years/nbrfxrates{self.__invoice_date.year}.xml",
-                headers={"Accept": "text/xml", "Accept-Encoding": "utf-8"}
-            )
-            root = Etree.fromstring(res.text)
-            invoice_date_str = self.__invoice_date.strftime("%Y-%m-%d")
-            date_rates = None
-            for cube_node in root.findall(".//{http://www.bnr.ro/xsd}Cube"):
-                if cube_node.attrib["date"] == invoice_date_str:
-                    date_rates = cube_node
-            if date_rates is None:
-                self._log.info("can't find BNR fx rates for %s", invoice_date_str)
-                return
+        cache_key = (symbol, invoice_date.strftime("%Y-%m-%d"))
+        rates = rates_cache.get(cache_key)
+        if rates is None:
+            rates = self._download_rates(provider, symbol, invoice_date)
+            if rates is not None:
+                rates_cache[cache_key] = rates
+        self._set_currency_info(invoice, symbol, dict(rates or {}))
 
-            for rate in date_rates.findall("{http://www.bnr.ro/xsd}Rate"):
-                currency = rate.attrib["currency"]
-                if currency == symbol:
-                    rates["RON"] = Decimal(rate.text)
+    def _download_rates(self, provider: FxRateProvider, symbol: str, invoice_date: datetime) -> Optional[dict]:
+        try:
+            found = provider.rates_for([invoice_date.date()], [symbol])
         except Etree.ParseError:
-            self._log.warning("invalid XML downloaded from BNR")
+            self._log.warning("invalid XML downloaded from %s", provider.name)
+            return None
         except Exception as exc:
-            self._log.error("download error on BNR fx-rates", exc_info=exc)
-        finally:
-            self._set_currency_info(symbol, rates)
+            self._log.error("download error on %s fx-rates", provider.name, exc_info=exc)
+            return None
+
+        date_rates = found.get(invoice_date.date())
+        if date_rates is None:
+            self._log.info("can't find %s fx rates for %s", provider.name, invoice_date.strftime("%Y-%m-%d"))
+            return {}
+        return {provider.base_currency: date_rates[symbol]} if symbol in date_rates else {}
@@ -1,142 +1,165 @@
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from logging import getLogger
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 from invoice_utils.models import InvoicedItem
 
-from ._currency import BnrFxRateRule, CurrencyRule
-from ._header import HeaderRule
+from ._observer import EngineObserver
+from ._plan import ExecutionPlan
+from ._results import (
+    CurrencyBreakdown, CurrencyTotals, InvoiceTotals, LineItem, ResultSchema, TotalsAccumulator
+)
 
 
-class InvoicingEngine:
-    def __init__(self, rules: list[dict]):
-        self._log = getLogger(self.__class__.__name__)
-        self.__rules = rules
-        self.__init_invoice()
+@dataclass(slots=True)
+class _InvoiceContext:
+    invoice: dict = field(default_factory=lambda: {"items": []})
+    main_currency: str = ""
+    totals: Optional[TotalsAccumulator] = None
+    currencies: list[tuple[str, Any, TotalsAccumulator]] = field(default_factory=list)
+    rates_cache: dict = field(default_factory=dict)
+
 
-    def __init_invoice(self):
-        self.__invoice = {
-            "items": [],
-            "totals": {"price": 0, "total": 0, "extra": {}},
-        }
+class InvoiceStream:
+    def __init__(self, header: dict, lines: Iterator[LineItem], finish: Callable[[], InvoiceTotals]):
+        self.header = header
+        self.__lines = lines
+        self.__finish = finish
+        self.__totals: Optional[InvoiceTotals] = None
 
-    def _process_item(self, item_no: int, item_tax: Decimal, item: InvoicedItem):
-        items = self.__invoice.get("items", [])
+    def __iter__(self) -> Iterator[LineItem]:
+        yield from self.__lines
+        self.__totals = self.__finish()
 
-        currency_info = self.__invoice["header"]["currency"]
+    @property
+    def totals(self) -> InvoiceTotals:
+        if self.__totals is None:
+            raise RuntimeError("invoice totals are available after all line items were consumed")
+        return self.__totals
+
+
+class InvoicingEngine:
+    def __init__(self, rules: list[dict], observer: Optional[EngineObserver] = None):
+        self._log = getLogger(self.__class__.__name__)
+        self.__observer = observer
+        self.__plan = ExecutionPlan.compile(rules)
+        self.__schema = ResultSchema(tuple(op.name for op in self.__plan.item_ops))
+        self.__applies = tuple(op.apply for op in self.__plan.item_ops)
+
+    def _process_item(self, ctx: _InvoiceContext, item_no: int, item: InvoicedItem) -> LineItem:
+        schema = self.__schema
         qty = round(Decimal(item.quantity), 6)
         unit_price = round(Decimal(item.unit_price), 6)
         item_price = round(qty * unit_price, 6)
 
-        taxes = []
-        extra_ops = [ rule for rule in self.__rules if rule.get("type") == "item_op" ]
-        for op_info in extra_ops:
-            op = op_info["operation"]
-            val = Decimal(op_info["value"])
-            name = op_info["name"]
-            if op == "*":
-                taxes.append({
-                    "name": name,
-                    "value": round(val * item_price, 6),
-                })
-            elif op == "+":
-                taxes.append({
-                    "name": name,
-                    "value": round(val + item_price, 6)
-                })
-        item_tax = round(sum(Decimal(tax["value"]) for tax in taxes), 6)
-        extra_currencies = []
-        for currency, rate in currency_info.get("exchangeRates", {}).items():
-            dec_rate = round(Decimal(rate), 6)
-            up_currency = round(unit_price * dec_rate, 6)
+        tax_values: list[Decimal] = []
+        for apply in self.__applies:
+            tax_values.append(apply(item_price, qty, tax_values))
+        taxes = tuple(tax_values)
+        item_total = item_price + sum(taxes)
+        assert ctx.totals is not None
+        ctx.totals.add(item_price, item_total, taxes)
+        extra_currencies: list[CurrencyBreakdown] = []
+        for currency, rate, currency_totals in ctx.currencies:
+            up_currency = round(unit_price * rate, 6)
             ip_currency = round(qty * up_currency, 6)
-            currency_taxes = []
-            for tax in taxes:
-                currency_taxes.append({
-                    "name": tax["name"],
-                    "value": round(Decimal(tax["value"]) * dec_rate, 6),
-                })
-            it_currency = round(sum(Decimal(tax["value"]) for tax in currency_taxes), 6)
-            extra_currencies.append(
-                {
-                    "currency": currency,
-                    "unit_price": up_currency,
-                    "item_price": ip_currency,
-                    "item_total": ip_currency + it_currency,
-                    "taxes": currency_taxes
-                }
-            )
+            currency_taxes = tuple(round(value * rate, 6) for value in taxes)
+            it_currency = ip_currency + sum(currency_taxes)
+            currency_totals.add(ip_currency, it_currency, currency_taxes)
+            extra_currencies.append(CurrencyBreakdown(
+                schema, currency, up_currency, ip_currency, it_currency, currency_taxes
+            ))
+
+        return LineItem(
+            schema, item_no, ctx.main_currency, item.text, qty, unit_price, item_price,
+            item_total, taxes, tuple(extra_currencies)
+        )
 
-        items.append(
-            {
-                "item_no": item_no,
-                "currency": currency_info.get("main", ""),
-                "text": item.text,
-                "quantity": qty,
-                "unit_price": unit_price,
-                "item_price": item_price,
-                "item_total": item_price + item_tax,
-                "taxes": taxes,
-                "extra": {
-                    "currencies": extra_currencies,
-                }
-            }
+    def _compute_totals(self, ctx: _InvoiceContext) -> InvoiceTotals:
+        schema = self.__schema
+        assert ctx.totals is not None
+        currencies = tuple(
+            CurrencyTotals(currency, acc.price, acc.total, acc.tax_totals(schema))
+            for currency, _, acc in ctx.currencies if acc.count
         )
-        self.__invoice["items"] = items
-
-    def _compute_totals(self, input_items: list[dict]):
-        result = {
-            "price": sum(map(lambda i: i["item_price"], input_items)),
-            "total": sum(map(lambda i: i["item_total"], input_items)),
-        }
-        tax_totals = {}
-        for item in input_items:
-            for tax in item["taxes"]:
-                current_value = Decimal(tax_totals.get(tax["name"], 0))
-                current_value += Decimal(tax["value"])
-                tax_totals[tax["name"]] = current_value
-        if tax_totals:
-            result["taxes"] = [
-                {
-                    "name": tax,
-                    "value": value,
-                } for tax, value in tax_totals.items()
-            ]
-        return result
+        return InvoiceTotals(ctx.totals.price, ctx.totals.total, ctx.totals.tax_totals(schema), currencies)
 
     def process(
-        self, invoice_no: int, invoice_date: datetime, items: list[InvoicedItem] = None
+        self, invoice_no: int, invoice_date: datetime, items: Optional[list[InvoicedItem]] = None
     ):
-        self.__init_invoice()
-        items = items or []
-
-        for process_rule in [
-            HeaderRule(self.__invoice, self.__rules, invoice_no, invoice_date),
-            CurrencyRule(self.__invoice, self.__rules),
-            BnrFxRateRule(self.__invoice, self.__rules, invoice_date),
-        ]:
-            process_rule()
-
-        for index, item in enumerate(items):
-            vat = round(Decimal(0.19) * Decimal(item.unit_price) * Decimal(item.quantity), 6)
-            self._process_item(index + 1, vat, item)
-        main_currency_totals = self._compute_totals(self.__invoice["items"])
-        self.__invoice["totals"].update(main_currency_totals)
-
-        items_by_currency = {}
-        for item in self.__invoice["items"]:
-            extra_currencies = item["extra"]["currencies"]
-            for sub_item in extra_currencies:
-                key = sub_item["currency"]
-                same_currency_items = items_by_currency.get(key, [])
-                same_currency_items.append(sub_item)
-                items_by_currency[key] = same_currency_items
-        if len(items_by_currency) > 0:
-            total_in_currencies = []
-            for currency, currency_items in items_by_currency.items():
-                currency_totals = self._compute_totals(currency_items)
-                currency_totals["currency"] = currency
-                total_in_currencies.append(currency_totals)
-            self.__invoice["totals"]["extra"]["currencies"] = total_in_currencies
-
-        return self.__invoice
+        return self._process(_InvoiceContext(), invoice_no, invoice_date, items or [])
+
+    def process_many(
+        self, invoices: Iterable[tuple[int, datetime, list[InvoicedItem]]]
+    ) -> Iterator[dict]:
+        rates_cache: dict = {}
+        for invoice_no, invoice_date, items in invoices:
+            yield self._process(
+                _InvoiceContext(rates_cache=rates_cache), invoice_no, invoice_date, items or []
+            )
+
+    def stream(
+        self, invoice_no: int, invoice_date: datetime, items: Iterable[InvoicedItem]
+    ) -> InvoiceStream:
+        return self._stream(_InvoiceContext(), invoice_no, invoice_date, items)
+
+    def _process(
+        self, ctx: _InvoiceContext, invoice_no: int, invoice_date: datetime, items: Iterable[InvoicedItem]
+    ):
+        stream = self._stream(ctx, invoice_no, invoice_date, items)
+        ctx.invoice["items"] = list(stream)
+        ctx.invoice["totals"] = stream.totals
+        return ctx.invoice
+
+    def _stream(
+        self, ctx: _InvoiceContext, invoice_no: int, invoice_date: datetime, items: Iterable[InvoicedItem]
+    ) -> InvoiceStream:
+        observer = self.__observer
+        invoice_start = started = perf_counter()
+        for process_rule in self.__plan.header_rules:
+            process_rule(ctx.invoice, invoice_no, invoice_date, ctx.rates_cache)
+            if observer is not None:
+                stage_end = perf_counter()
+                observer.on_stage(invoice_no, process_rule.__class__.__name__, stage_end - started)
+                started = stage_end
+        currency_info = ctx.invoice["header"]["currency"]
+        ctx.main_currency = currency_info.get("main", "")
+        tax_count = len(self.__plan.item_ops)
+        ctx.totals = TotalsAccumulator(tax_count)
+        ctx.currencies = [
+            (currency, round(Decimal(rate), 6), TotalsAccumulator(tax_count))
+            for currency, rate in currency_info.get("exchangeRates", {}).items()
+        ]
+
+        lines = (self._process_item(ctx, item_no, item) for item_no, item in enumerate(items, start=1))
+        if observer is None:
+            return InvoiceStream(ctx.invoice["header"], lines, lambda: self._compute_totals(ctx))
+        return self._observed_stream(ctx, invoice_no, lines, invoice_start)
+
+    def _observed_stream(
+        self, ctx: _InvoiceContext, invoice_no: int, lines: Iterator[LineItem], started: float
+    ) -> InvoiceStream:
+        observer, counters = self.__observer, [0, 0.0]
+
+        def observed_lines():
+            while True:
+                line_start = perf_counter()
+                line = next(lines, None)
+                counters[1] += perf_counter() - line_start
+                if line is None:
+                    return
+                counters[0] += 1
+                yield line
+
+        def finish():
+            observer.on_stage(invoice_no, "items", counters[1])
+            totals_start = perf_counter()
+            totals = self._compute_totals(ctx)
+            observer.on_stage(invoice_no, "totals", perf_counter() - totals_start)
+            observer.on_invoice(invoice_no, counters[0], len(ctx.currencies), perf_counter() - started)
+            return totals
+
+        return InvoiceStream(ctx.invoice["header"], observed_lines(), finish)
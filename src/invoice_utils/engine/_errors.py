@@ -13,3 +13,17 @@ class InvoicingInputError(Exception):
 class InvoicingInputFormatError(InvoicingInputError):
     def _construct_message(self, file_name):
         return f"file '{file_name}' not does not contain valid json"
+
+
+class InvalidRuleError(ValueError):
+    pass
+
+
+class InvalidItemOperationError(InvalidRuleError):
+    def __init__(self, rule: dict, reason: str):
+        super().__init__(f"item operation '{rule.get('name', '')}' {reason}")
+
+
+class InvalidFxRateRuleError(InvalidRuleError):
+    def __init__(self, rule: dict, reason: str):
+        super().__init__(f"{rule.get('type', '')} rule: {reason}")
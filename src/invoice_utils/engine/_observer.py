@@ -0,0 +1,23 @@
+from logging import getLogger
+
+
+class EngineObserver:
+    def on_stage(self, invoice_no: int, stage: str, seconds: float):
+        pass
+
+    def on_invoice(self, invoice_no: int, items: int, currencies: int, seconds: float):
+        pass
+
+
+class LoggingEngineObserver(EngineObserver):
+    def __init__(self):
+        self._log = getLogger(self.__class__.__name__)
+
+    def on_stage(self, invoice_no: int, stage: str, seconds: float):
+        self._log.debug("invoice %s: %s took %.6fs", invoice_no, stage, seconds)
+
+    def on_invoice(self, invoice_no: int, items: int, currencies: int, seconds: float):
+        self._log.info(
+            "invoice %s: processed %d items in %d secondary currencies in %.6fs",
+            invoice_no, items, currencies, seconds
+        )
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable
+
+from ._errors import InvalidItemOperationError
+
+ItemOperationCompiler = Callable[[dict], Callable]
+
+_ITEM_OPERATIONS: dict[str, tuple[ItemOperationCompiler, tuple[str, ...]]] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class ItemOperation:
+    name: str
+    apply: Callable[..., Any]
+
+
+def register_item_operation(
+    operation: str, required: tuple[str, ...] = ("value",)
+) -> Callable[[ItemOperationCompiler], ItemOperationCompiler]:
+    def register(compiler: ItemOperationCompiler) -> ItemOperationCompiler:
+        _ITEM_OPERATIONS[operation] = compiler, ("name", *required)
+        return compiler
+    return register
+
+
+def item_operations() -> tuple[str, ...]:
+    return tuple(_ITEM_OPERATIONS)
+
+
+def compile_item_operation(rule: dict) -> ItemOperation:
+    operation = rule.get("operation")
+    if operation not in _ITEM_OPERATIONS:
+        raise InvalidItemOperationError(rule, f"has unknown operation {operation!r}")
+    compiler, required = _ITEM_OPERATIONS[operation]
+    missing = [key for key in required if key not in rule]
+    if missing:
+        raise InvalidItemOperationError(rule, f"is missing {', '.join(map(repr, missing))}")
+    try:
+        return ItemOperation(rule["name"], compiler(rule))
+    except (ArithmeticError, TypeError, ValueError) as exc:
+        raise InvalidItemOperationError(rule, f"has an invalid value: {exc}") from exc
+
+
+@register_item_operation("*")
+def _rate(rule: dict) -> Callable:
+    rate = Decimal(rule["value"])
+    return lambda price, quantity=None, taxes=(): round(rate * price, 6)
+
+
+@register_item_operation("+")
+def _offset(rule: dict) -> Callable:
+    amount = Decimal(rule["value"])
+    return lambda price, quantity=None, taxes=(): round(amount + price, 6)
+
+
+@register_item_operation("%")
+def _percentage(rule: dict) -> Callable:
+    rate = Decimal(rule["value"]).scaleb(-2)
+    return lambda price, quantity=None, taxes=(): round(rate * price, 6)
+
+
+@register_item_operation("fixed")
+def _fixed(rule: dict) -> Callable:
+    amount = round(Decimal(rule["value"]), 6)
+    return lambda price, quantity=None, taxes=(): amount
+
+
+@register_item_operation("per-unit")
+def _per_unit(rule: dict) -> Callable:
+    amount = round(Decimal(rule["value"]), 6)
+    return lambda price, quantity=None, taxes=(): round(quantity * amount, 6)
+
+
+@register_item_operation("capped", ("value", "cap"))
+def _capped(rule: dict) -> Callable:
+    rate, cap = Decimal(rule["value"]), round(Decimal(rule["cap"]), 6)
+    return lambda price, quantity=None, taxes=(): min(round(rate * price, 6), cap)
+
+
+@register_item_operation("compound")
+def _compound(rule: dict) -> Callable:
+    rate = Decimal(rule["value"])
+    return lambda price, quantity=None, taxes=(): round(rate * (price + sum(taxes)), 6)
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from ._currency import CurrencyRule, FxRateRule
+from ._header import HeaderRule
+from ._operations import ItemOperation, compile_item_operation
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutionPlan:
+    header_rules: tuple[Callable, ...]
+    item_ops: tuple[ItemOperation, ...]
+
+    @classmethod
+    def compile(cls, rules: list[dict]) -> "ExecutionPlan":
+        return cls(
+            header_rules=(
+                HeaderRule(rules),
+                CurrencyRule(rules),
+                FxRateRule(rules),
+            ),
+            item_ops=tuple(compile_item_operation(rule) for rule in rules if rule.get("type") == "item_op"),
+        )
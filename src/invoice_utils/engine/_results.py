@@ -0,0 +1,160 @@
+from collections.abc import Mapping
+from decimal import Decimal
+from operator import add
+from typing import Iterable
+
+
+class _ResultView(Mapping):
+    __slots__ = ()
+    _keys: tuple[str, ...] = ()
+
+    def _present_keys(self) -> tuple[str, ...]:
+        return self._keys
+
+    def __getitem__(self, key: str):
+        if key not in self._present_keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._present_keys())
+
+    def __len__(self):
+        return len(self._present_keys())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ResultSchema:
+    __slots__ = ("tax_names",)
+
+    def __init__(self, tax_names: tuple[str, ...]):
+        self.tax_names = tax_names
+
+    def taxes(self, values: Iterable[Decimal]) -> list["TaxAmount"]:
+        return [TaxAmount(name, value) for name, value in zip(self.tax_names, values)]
+
+
+class TaxAmount(_ResultView):
+    __slots__ = ("name", "value")
+    _keys = ("name", "value")
+
+    def __init__(self, name: str, value: Decimal):
+        self.name = name
+        self.value = value
+
+
+class CurrencyBreakdown(_ResultView):
+    __slots__ = ("_schema", "currency", "unit_price", "item_price", "item_total", "_taxes")
+    _keys = ("currency", "unit_price", "item_price", "item_total", "taxes")
+
+    def __init__(
+        self, schema: ResultSchema, currency: str, unit_price: Decimal, item_price: Decimal, item_total: Decimal,
+        taxes: tuple[Decimal, ...]
+    ):
+        self._schema = schema
+        self.currency = currency
+        self.unit_price = unit_price
+        self.item_price = item_price
+        self.item_total = item_total
+        self._taxes = taxes
+
+    @property
+    def taxes(self) -> list[TaxAmount]:
+        return self._schema.taxes(self._taxes)
+
+
+class LineItem(_ResultView):
+    __slots__ = (
+        "_schema", "item_no", "currency", "text", "quantity", "unit_price", "item_price", "item_total",
+        "_taxes", "_currencies",
+    )
+    _keys = ("item_no", "currency", "text", "quantity", "unit_price", "item_price", "item_total", "taxes", "extra")
+
+    def __init__(
+        self, schema: ResultSchema, item_no: int, currency: str, text: str, quantity: Decimal,
+        unit_price: Decimal, item_price: Decimal, item_total: Decimal, taxes: tuple[Decimal, ...],
+        currencies: tuple[CurrencyBreakdown, ...]
+    ):
+        self._schema = schema
+        self.item_no = item_no
+        self.currency = currency
+        self.text = text
+        self.quantity = quantity
+        self.unit_price = unit_price
+        self.item_price = item_price
+        self.item_total = item_total
+        self._taxes = taxes
+        self._currencies = currencies
+
+    @property
+    def taxes(self) -> list[TaxAmount]:
+        return self._schema.taxes(self._taxes)
+
+    @property
+    def extra(self) -> dict:
+        return {"currencies": list(self._currencies)}
+
+
+class _Totals(_ResultView):
+    __slots__ = ("price", "total", "_taxes")
+
+    def __init__(self, price: Decimal, total: Decimal, taxes: dict[str, Decimal]):
+        self.price = price
+        self.total = total
+        self._taxes = taxes
+
+    def _present_keys(self) -> tuple[str, ...]:
+        return self._keys if self._taxes else tuple(k for k in self._keys if k != "taxes")
+
+    @property
+    def taxes(self) -> list[TaxAmount]:
+        return [TaxAmount(name, value) for name, value in self._taxes.items()]
+
+
+class CurrencyTotals(_Totals):
+    __slots__ = ("currency",)
+    _keys = ("price", "total", "taxes", "currency")
+
+    def __init__(self, currency: str, price: Decimal, total: Decimal, taxes: dict[str, Decimal]):
+        super().__init__(price, total, taxes)
+        self.currency = currency
+
+
+class InvoiceTotals(_Totals):
+    __slots__ = ("_currencies",)
+    _keys = ("price", "total", "taxes", "extra")
+
+    def __init__(
+        self, price: Decimal, total: Decimal, taxes: dict[str, Decimal], currencies: tuple[CurrencyTotals, ...]
+    ):
+        super().__init__(price, total, taxes)
+        self._currencies = currencies
+
+    @property
+    def extra(self) -> dict:
+        return {"currencies": list(self._currencies)} if self._currencies else {}
+
+
+class TotalsAccumulator:
+    __slots__ = ("count", "price", "total", "taxes")
+
+    def __init__(self, tax_count: int):
+        self.count = 0
+        self.price = Decimal(0)
+        self.total = Decimal(0)
+        self.taxes = [Decimal(0)] * tax_count
+
+    def add(self, price: Decimal, total: Decimal, taxes: tuple[Decimal, ...]):
+        self.count += 1
+        self.price += price
+        self.total += total
+        self.taxes = list(map(add, self.taxes, taxes))
+
+    def tax_totals(self, schema: ResultSchema) -> dict[str, Decimal]:
+        result: dict[str, Decimal] = {}
+        if self.count:
+            for name, value in zip(schema.tax_names, self.taxes):
+                result[name] = result.get(name, Decimal(0)) + value
+        return result
@@ -0,0 +1,18 @@
+from invoice_utils.fx._bnr import BnrRates, bnr_rates
+from invoice_utils.fx._cache import FxFileCache, default_cache
+from invoice_utils.fx._index import FxRateIndex, iter_bnr_rates
+from invoice_utils.fx._provider import (
+    DEFAULT_LOOKBACK_DAYS, BnrFxRateProvider, CompositeFxRateProvider, FileFxRateProvider, FxRateProvider,
+    InvalidFxProviderError, StaticFxRateProvider, fx_provider,
+)
+from invoice_utils.fx._refresh import FxRateRefresher, default_refresher
+from invoice_utils.fx._session import fx_session, fx_timeout
+from invoice_utils.fx._singleflight import SingleFlight
+from invoice_utils.fx._store import FxRateStore, default_store
+
+__all__ = [
+    "DEFAULT_LOOKBACK_DAYS", "BnrFxRateProvider", "BnrRates", "CompositeFxRateProvider", "FileFxRateProvider",
+    "FxFileCache", "FxRateIndex", "FxRateProvider", "FxRateRefresher", "FxRateStore", "InvalidFxProviderError",
+    "SingleFlight", "StaticFxRateProvider", "bnr_rates", "default_cache", "default_refresher", "default_store",
+    "fx_provider", "fx_session", "fx_timeout", "iter_bnr_rates",
+]
@@ -0,0 +1,123 @@
+import time
+from datetime import datetime
+from http import HTTPStatus
+from logging import getLogger
+from threading import Lock
+from typing import Callable, Optional
+from xml.etree import ElementTree as Etree
+
+import requests
+
+import invoice_utils.config as config
+from invoice_utils.fx._cache import FxFileCache, default_cache
+from invoice_utils.fx._index import FxRateIndex
+from invoice_utils.fx._singleflight import SingleFlight
+from invoice_utils.fx._store import FxRateStore, default_store
+
+_SOURCE = "BNR"
+
+
+class BnrRates:
+    def __init__(
+        self, cache_factory: Callable[[], FxFileCache] = default_cache, clock: Callable[[], float] = time.time,
+        store_factory: Callable[[], Optional[FxRateStore]] = default_store
+    ):
+        self._log = getLogger(self.__class__.__name__)
+        self._cache_factory = cache_factory
+        self._store_factory = store_factory
+        self._clock = clock
+        self._lock = Lock()
+        self._flights: SingleFlight[FxRateIndex] = SingleFlight()
+        self._indexes: dict[tuple[str, int], tuple[FxRateIndex, Optional[float]]] = {}
+        self.serve_stale = False
+
+    @staticmethod
+    def url(year: int) -> str:
+        return f"{config.INVOICE_UTILS_BNR_URL}/nbrfxrates{year}.xml"
+
+    def index(self, year: int) -> FxRateIndex:
+        key = (self.url(year), year)
+        index = self._cached(key)
+        if index is not None:
+            return index
+        return self._flights.do(key, lambda: self._load(key, year, revalidate=False))
+
+    def _cached(self, key: tuple[str, int]) -> Optional[FxRateIndex]:
+        with self._lock:
+            index, expires = self._indexes.get(key, (None, None))
+        if index is not None and (expires is None or self.serve_stale or self._clock() < expires):
+            return index
+        return None
+
+    def _final(self, key: tuple[str, int]) -> Optional[FxRateIndex]:
+        with self._lock:
+            index, expires = self._indexes.get(key, (None, None))
+        return index if expires is None else None
+
+    def refresh(self, year: int) -> FxRateIndex:
+        key = (self.url(year), year)
+        index = self._final(key)
+        if index is not None:
+            return index
+        return self._flights.do(key, lambda: self._load(key, year, revalidate=True))
+
+    async def refresh_async(self, year: int) -> FxRateIndex:
+        key = (self.url(year), year)
+        index = self._final(key)
+        if index is not None:
+            return index
+        return await self._flights.do_async(key, lambda: self._load(key, year, revalidate=True))
+
+    def _load(self, key: tuple[str, int], year: int, revalidate: bool) -> FxRateIndex:
+        now = self._clock()
+        final = now >= datetime(year + 1, 1, 1).timestamp() + config.INVOICE_UTILS_FX_CACHE_TTL
+        store = self._store_factory()
+        index = None if store is None or revalidate else store.index(_SOURCE, year, final_only=True)
+        if index is not None:
+            return self._keep(key, index, None)
+        try:
+            index = self._download(key[0], year, revalidate)
+        except (Etree.ParseError, LookupError, ArithmeticError):
+            raise
+        except Exception as exc:
+            if _not_published(exc):
+                self._log.info("no FX rates published for %s yet", year)
+                return self._keep(key, FxRateIndex({}), now + config.INVOICE_UTILS_FX_CACHE_TTL)
+            index = None if store is None else store.index(_SOURCE, year)
+            if index is None:
+                raise
+            self._log.warning("serving stored FX rates for %s: %s", year, exc)
+            return self._keep(key, index, now + config.INVOICE_UTILS_FX_CACHE_TTL)
+        if store is not None:
+            store.put(_SOURCE, year, index, final)
+        return self._keep(key, index, None if final else now + config.INVOICE_UTILS_FX_CACHE_TTL)
+
+    def _download(self, url: str, year: int, revalidate: bool) -> FxRateIndex:
+        cache = self._cache_factory()
+        try:
+            with cache.open_yearly_file(url, year, revalidate) as source:
+                return FxRateIndex.from_bnr_xml(source)
+        except (Etree.ParseError, LookupError, ArithmeticError):
+            cache.invalidate(url)
+            raise
+
+    def _keep(self, key: tuple[str, int], index: FxRateIndex, expires: Optional[float]) -> FxRateIndex:
+        with self._lock:
+            self._indexes[key] = index, expires
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+def _not_published(exc: Exception) -> bool:
+    response = exc.response if isinstance(exc, requests.HTTPError) else None
+    return response is not None and response.status_code == HTTPStatus.NOT_FOUND
+
+
+_bnr_rates = BnrRates()
+
+
+def bnr_rates() -> BnrRates:
+    return _bnr_rates
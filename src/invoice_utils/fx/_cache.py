@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+import requests
+
+import invoice_utils.config as config
+from invoice_utils.fx._session import fx_session, fx_timeout
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class FxFileCache:
+    def __init__(self, directory: Optional[Path], ttl: float, clock: Callable[[], float] = time.time):
+        self._log = getLogger(self.__class__.__name__)
+        self._directory = directory
+        self._ttl = ttl
+        self._clock = clock
+
+    @contextmanager
+    def open_yearly_file(self, url: str, year: int, revalidate: bool = False) -> Iterator[BinaryIO]:
+        if self._directory is None:
+            with self._get(url, {}) as res:
+                res.raise_for_status()
+                res.raw.decode_content = True
+                yield res.raw
+            return
+        with open(self._refresh(url, year, revalidate), "rb") as f:
+            yield f
+
+    def _refresh(self, url: str, year: int, revalidate: bool) -> Path:
+        assert self._directory is not None
+        name = url.rsplit("/", 1)[-1]
+        content_path, meta_path = self._directory / name, self._directory / f"{name}.meta.json"
+        meta = self._read_meta(meta_path) if content_path.exists() else None
+        if meta is not None and not revalidate and self._is_fresh(meta, year):
+            return content_path
+
+        try:
+            with self._get(url, meta or {}) as res:
+                fetched = self._clock()
+                if res.status_code == 304 and meta is not None:
+                    self._write_meta(meta_path, {**meta, "fetched": fetched})
+                    return content_path
+                res.raise_for_status()
+                self._write(content_path, res.iter_content(_CHUNK_SIZE))
+                self._write_meta(meta_path, {
+                    "etag": res.headers.get("ETag"),
+                    "last_modified": res.headers.get("Last-Modified"),
+                    "fetched": fetched,
+                })
+        except requests.RequestException as exc:
+            if meta is None:
+                raise
+            self._log.warning("serving stale FX file %s: %s", name, exc)
+        return content_path
+
+    def invalidate(self, url: str):
+        if self._directory is None:
+            return
+        name = url.rsplit("/", 1)[-1]
+        for path in (self._directory / name, self._directory / f"{name}.meta.json"):
+            path.unlink(missing_ok=True)
+
+    def _is_fresh(self, meta: dict, year: int) -> bool:
+        fetched = meta.get("fetched", 0)
+        if fetched >= datetime(year + 1, 1, 1).timestamp():
+            return True
+        return self._clock() - fetched < self._ttl
+
+    @staticmethod
+    def _get(url: str, meta: dict) -> requests.Response:
+        headers = {"Accept": "text/xml", "Accept-Encoding": "utf-8"}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return fx_session().get(url, headers=headers, stream=True, timeout=fx_timeout())
+
+    def _read_meta(self, meta_path: Path) -> Optional[dict]:
+        try:
+            return json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            self._log.warning("ignoring unreadable FX cache metadata %s", meta_path)
+            return None
+
+    def _write_meta(self, meta_path: Path, meta: dict):
+        self._write(meta_path, [json.dumps(meta).encode()])
+
+    def _write(self, path: Path, chunks: Iterable[bytes]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+def default_cache() -> FxFileCache:
+    directory = config.INVOICE_UTILS_FX_CACHE_DIR
+    return FxFileCache(Path(directory) if directory else None, config.INVOICE_UTILS_FX_CACHE_TTL)
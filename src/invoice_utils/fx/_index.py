@@ -0,0 +1,45 @@
+from bisect import bisect_right
+from decimal import Decimal
+from typing import BinaryIO, Iterator, Optional
+from xml.etree import ElementTree as Etree
+
+_BNR_NS = "{http://www.bnr.ro/xsd}"
+_CUBE = f"{_BNR_NS}Cube"
+_RATE = f"{_BNR_NS}Rate"
+
+
+def iter_bnr_rates(source: BinaryIO) -> Iterator[tuple[str, dict[str, Decimal]]]:
+    for _, element in Etree.iterparse(source, events=("end",)):
+        if element.tag == _CUBE:
+            yield element.attrib["date"], {
+                rate.attrib["currency"]: Decimal(rate.text) for rate in element.iter(_RATE)
+            }
+            element.clear()
+
+
+class FxRateIndex:
+    __slots__ = ("_rates", "_dates")
+
+    def __init__(self, rates: dict[str, dict[str, Decimal]]):
+        self._rates = rates
+        self._dates = sorted(rates)
+
+    def rates_on(self, date: str) -> Optional[dict[str, Decimal]]:
+        return self._rates.get(date)
+
+    def latest_on_or_before(self, date: str) -> Optional[tuple[str, dict[str, Decimal]]]:
+        position = bisect_right(self._dates, date)
+        if position == 0:
+            return None
+        published = self._dates[position - 1]
+        return published, self._rates[published]
+
+    def items(self) -> Iterator[tuple[str, dict[str, Decimal]]]:
+        return iter(self._rates.items())
+
+    def __len__(self):
+        return len(self._rates)
+
+    @classmethod
+    def from_bnr_xml(cls, source: BinaryIO) -> "FxRateIndex":
+        return cls(dict(iter_bnr_rates(source)))
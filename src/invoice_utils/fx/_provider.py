@@ -0,0 +1,178 @@
+import csv
+import json
+from abc import ABCMeta, abstractmethod
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Iterable, Optional
+
+from invoice_utils.fx._bnr import BnrRates, bnr_rates
+from invoice_utils.fx._index import FxRateIndex
+
+FxRates = dict[date, dict[str, Decimal]]
+DEFAULT_LOOKBACK_DAYS = 7
+
+
+class InvalidFxProviderError(ValueError):
+    pass
+
+
+class FxRateProvider(metaclass=ABCMeta):
+    name = ""
+    base_currency = "RON"
+    lookback_days = DEFAULT_LOOKBACK_DAYS
+
+    @abstractmethod
+    def rates_for(self, dates: Iterable[date], currencies: Iterable[str]) -> FxRates:
+        return {}
+
+    @staticmethod
+    def _select(rates: Optional[dict], currencies: set[str]) -> Optional[dict[str, Decimal]]:
+        if rates is None:
+            return None
+        return {currency: rate for currency, rate in rates.items() if currency in currencies}
+
+    def _latest(self, index: FxRateIndex, day: date) -> tuple[bool, Optional[dict[str, Decimal]]]:
+        found = index.latest_on_or_before(day.isoformat())
+        if found is None:
+            return False, None
+        published, rates = found
+        return True, rates if (day - date.fromisoformat(published)).days <= self.lookback_days else None
+
+
+class BnrFxRateProvider(FxRateProvider):
+    name = "BNR"
+
+    def __init__(self, rates: Optional[BnrRates] = None, lookback_days: int = DEFAULT_LOOKBACK_DAYS):
+        self._rates = rates
+        self.lookback_days = lookback_days
+
+    def rates_for(self, dates: Iterable[date], currencies: Iterable[str]) -> FxRates:
+        currencies = set(currencies)
+        result = {}
+        for day in dates:
+            day_rates = self._select(self._resolve(day), currencies)
+            if day_rates is not None:
+                result[day] = day_rates
+        return result
+
+    def _resolve(self, day: date) -> Optional[dict[str, Decimal]]:
+        rates = self._rates or bnr_rates()
+        earliest_year = (day - timedelta(days=self.lookback_days)).year
+        for year in range(day.year, earliest_year - 1, -1):
+            found, day_rates = self._latest(rates.index(year), day)
+            if found:
+                return day_rates
+        return None
+
+
+class StaticFxRateProvider(FxRateProvider):
+    name = "static"
+
+    def __init__(self, rates: dict[str, object], base_currency: str = "RON"):
+        self._rates = {currency: Decimal(str(rate)) for currency, rate in rates.items()}
+        self.base_currency = base_currency
+        self.lookback_days = 0
+
+    def rates_for(self, dates: Iterable[date], currencies: Iterable[str]) -> FxRates:
+        currencies = set(currencies)
+        day_rates = {currency: rate for currency, rate in self._rates.items() if currency in currencies}
+        return {day: dict(day_rates) for day in dates}
+
+
+class FileFxRateProvider(FxRateProvider):
+    name = "file"
+
+    def __init__(self, path: Path, base_currency: str = "RON", lookback_days: int = DEFAULT_LOOKBACK_DAYS):
+        self._path = Path(path)
+        self.base_currency = base_currency
+        self.lookback_days = lookback_days
+        self._lock = Lock()
+        self._loaded: tuple[float, FxRateIndex] = (-1.0, FxRateIndex({}))
+
+    def rates_for(self, dates: Iterable[date], currencies: Iterable[str]) -> FxRates:
+        index, currencies = self._index(), set(currencies)
+        result = {}
+        for day in dates:
+            day_rates = self._select(self._latest(index, day)[1], currencies)
+            if day_rates is not None:
+                result[day] = day_rates
+        return result
+
+    def _index(self) -> FxRateIndex:
+        mtime = self._path.stat().st_mtime
+        with self._lock:
+            if self._loaded[0] != mtime:
+                self._loaded = mtime, FxRateIndex(self._load())
+            return self._loaded[1]
+
+    def _load(self) -> dict[str, dict[str, Decimal]]:
+        rates: defaultdict[str, dict[str, Decimal]] = defaultdict(dict)
+        with open(self._path, newline="") as f:
+            if self._path.suffix.lower() == ".csv":
+                for row in csv.DictReader(f):
+                    rates[row["date"]][row["currency"]] = Decimal(row["rate"])
+            else:
+                content = json.load(f)
+                for day, day_rates in content["rates"].items():
+                    rates[day] = {currency: Decimal(str(rate)) for currency, rate in day_rates.items()}
+        return dict(rates)
+
+
+class CompositeFxRateProvider(FxRateProvider):
+    def __init__(self, providers: list[FxRateProvider]):
+        if not providers:
+            raise InvalidFxProviderError("a composite FX rate provider needs at least one provider")
+        if len({provider.base_currency for provider in providers}) > 1:
+            raise InvalidFxProviderError("FX rate providers must share the same base currency")
+        self._log = getLogger(self.__class__.__name__)
+        self._providers = providers
+        self.name = "/".join(provider.name for provider in providers)
+        self.base_currency = providers[0].base_currency
+
+    def rates_for(self, dates: Iterable[date], currencies: Iterable[str]) -> FxRates:
+        currencies = set(currencies)
+        result: FxRates = {}
+        missing, error = list(dict.fromkeys(dates)), None
+        for provider in self._providers:
+            try:
+                found = provider.rates_for(missing, currencies)
+            except Exception as exc:
+                self._log.warning("FX rate provider %s failed, trying the next one", provider.name, exc_info=exc)
+                error = exc
+                continue
+            for day, day_rates in found.items():
+                known = result.setdefault(day, {})
+                known.update((currency, rate) for currency, rate in day_rates.items() if currency not in known)
+            missing = [day for day in missing if not currencies <= result.get(day, {}).keys()]
+            if not missing:
+                break
+        if error is not None and not result:
+            raise error
+        return result
+
+
+_PROVIDERS: dict[str, tuple[Callable[[dict, int], FxRateProvider], tuple[str, ...]]] = {
+    "bnr": (lambda spec, lookback_days: BnrFxRateProvider(lookback_days=lookback_days), ()),
+    "static": (lambda spec, lookback_days: StaticFxRateProvider(spec.get("rates", {}), spec.get("base", "RON")), ()),
+    "file": (
+        lambda spec, lookback_days: FileFxRateProvider(Path(spec["path"]), spec.get("base", "RON"), lookback_days),
+        ("path",),
+    ),
+}
+
+
+def fx_provider(specs: list[dict], lookback_days: int = DEFAULT_LOOKBACK_DAYS) -> FxRateProvider:
+    providers = []
+    for spec in specs:
+        if spec.get("type", "") not in _PROVIDERS:
+            raise InvalidFxProviderError(f"unknown FX rate provider '{spec.get('type')}'")
+        factory, required = _PROVIDERS[spec["type"]]
+        missing = ", ".join(repr(key) for key in required if key not in spec)
+        if missing:
+            raise InvalidFxProviderError(f"FX rate provider '{spec['type']}' is missing {missing}")
+        providers.append(factory(spec, spec.get("lookbackDays", lookback_days)))
+    return providers[0] if len(providers) == 1 else CompositeFxRateProvider(providers)
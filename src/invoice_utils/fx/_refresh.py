@@ -0,0 +1,58 @@
+import asyncio
+from logging import getLogger
+from typing import Optional
+
+import arrow
+
+import invoice_utils.config as config
+from invoice_utils.fx._bnr import BnrRates
+
+
+class FxRateRefresher:
+    def __init__(self, rates: BnrRates, refresh_at: str, timezone: str):
+        self._log = getLogger(self.__class__.__name__)
+        self._rates = rates
+        hour, minute = refresh_at.split(":")
+        self._refresh_at = int(hour), int(minute)
+        self._timezone = timezone
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._rates.serve_stale = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._rates.serve_stale = False
+
+    async def refresh(self):
+        current_year = arrow.now(self._timezone).year
+        for year in (current_year, current_year - 1):
+            try:
+                await self._rates.refresh_async(year)
+            except Exception as exc:
+                self._log.warning("FX rate refresh for %s failed, serving stale rates", year, exc_info=exc)
+
+    def seconds_until_next_refresh(self, now: Optional[arrow.Arrow] = None) -> float:
+        now = now or arrow.now(self._timezone)
+        hour, minute = self._refresh_at
+        next_refresh = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_refresh <= now:
+            next_refresh = next_refresh.shift(days=1)
+        return (next_refresh - now).total_seconds()
+
+    async def _run(self):
+        await self.refresh()
+        while True:
+            await asyncio.sleep(self.seconds_until_next_refresh())
+            await self.refresh()
+
+
+def default_refresher(rates: BnrRates) -> FxRateRefresher:
+    return FxRateRefresher(rates, config.INVOICE_UTILS_FX_REFRESH_AT, config.INVOICE_UTILS_FX_REFRESH_TIMEZONE)
@@ -0,0 +1,51 @@
+from threading import Lock
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import invoice_utils.config as config
+
+_session_lock = Lock()
+_session: tuple[tuple, Optional[requests.Session]] = ((), None)
+
+
+def _settings() -> tuple:
+    return (
+        config.INVOICE_UTILS_FX_HTTP_POOL_SIZE,
+        config.INVOICE_UTILS_FX_HTTP_RETRIES,
+        config.INVOICE_UTILS_FX_HTTP_BACKOFF,
+    )
+
+
+def _create_session(pool_size: int, retries: int, backoff: float) -> requests.Session:
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fx_session() -> requests.Session:
+    global _session
+    settings = _settings()
+    with _session_lock:
+        current_settings, session = _session
+        if session is None or current_settings != settings:
+            if session is not None:
+                session.close()
+            session = _create_session(*settings)
+            _session = settings, session
+        return session
+
+
+def fx_timeout() -> tuple[float, float]:
+    return config.INVOICE_UTILS_FX_HTTP_CONNECT_TIMEOUT, config.INVOICE_UTILS_FX_HTTP_READ_TIMEOUT
@@ -0,0 +1,77 @@
+import asyncio
+from threading import Event, Lock
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def _settle(future: asyncio.Future, call: _Call):
+    if future.done():
+        return
+    if call.error is not None:
+        future.set_exception(call.error)
+    else:
+        future.set_result(call.result)
+
+
+class SingleFlight(Generic[V]):
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], V]) -> V:
+        call, leader = self._join(key)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        return self._lead(key, call, fn)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], V]) -> V:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        call, leader = self._join(key, (loop, future))
+        if not leader:
+            return await future
+        return await asyncio.shield(loop.run_in_executor(None, self._lead, key, call, fn))
+
+    def _lead(self, key: Hashable, call: _Call, fn: Callable[[], V]) -> V:
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    def _join(
+        self, key: Hashable, waiter: Optional[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = None
+    ) -> tuple[_Call, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                return call, True
+            if waiter is not None:
+                call.waiters.append(waiter)
+            return call, False
+
+    def _finish(self, key: Hashable, call: _Call):
+        with self._lock:
+            del self._calls[key]
+            waiters, call.waiters = call.waiters, []
+            call.done.set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_settle, future, call)
@@ -0,0 +1,81 @@
+import sqlite3
+from contextlib import closing
+from decimal import Decimal
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+import invoice_utils.config as config
+from invoice_utils.fx._index import FxRateIndex
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS fx_rates (
+        source TEXT NOT NULL,
+        date TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        rate TEXT NOT NULL,
+        PRIMARY KEY (source, date, currency)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fx_years (
+        source TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        final INTEGER NOT NULL,
+        PRIMARY KEY (source, year)
+    ) WITHOUT ROWID
+    """,
+)
+STORE_FILE_NAME = "fx-rates.sqlite3"
+
+
+class FxRateStore:
+    def __init__(self, path: Path):
+        self._path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=30)
+
+    def put(self, source: str, year: int, index: FxRateIndex, final: bool):
+        rows = (
+            (source, day, currency, str(rate))
+            for day, day_rates in index.items() for currency, rate in day_rates.items()
+        )
+        with closing(self._connect()) as connection, connection:
+            connection.executemany("INSERT OR REPLACE INTO fx_rates VALUES (?, ?, ?, ?)", rows)
+            connection.execute("INSERT OR REPLACE INTO fx_years VALUES (?, ?, ?)", (source, year, int(final)))
+
+    def index(self, source: str, year: int, final_only: bool = False) -> Optional[FxRateIndex]:
+        with closing(self._connect()) as connection:
+            stored = connection.execute(
+                "SELECT final FROM fx_years WHERE source = ? AND year = ?", (source, year)
+            ).fetchone()
+            if stored is None or (final_only and not stored[0]):
+                return None
+            rates: dict[str, dict[str, Decimal]] = {}
+            for day, currency, rate in connection.execute(
+                "SELECT date, currency, rate FROM fx_rates WHERE source = ? AND date BETWEEN ? AND ?",
+                (source, f"{year:04}-01-01", f"{year:04}-12-31"),
+            ):
+                rates.setdefault(day, {})[currency] = Decimal(rate)
+        return FxRateIndex(rates)
+
+
+_stores: dict[Path, FxRateStore] = {}
+_stores_lock = Lock()
+
+
+def default_store() -> Optional[FxRateStore]:
+    directory = config.INVOICE_UTILS_FX_CACHE_DIR
+    if not directory:
+        return None
+    path = Path(directory) / STORE_FILE_NAME
+    with _stores_lock:
+        if path not in _stores or not path.exists():
+            _stores[path] = FxRateStore(path)
+        return _stores[path]
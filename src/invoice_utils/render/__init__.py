@@ -1,3 +1,6 @@
-from invoice_utils.render._render import PdfInvoiceRenderer
+from invoice_utils.render._render import PdfInvoiceRenderer, RenderTemplate, invoice_renderer
+from invoice_utils.render._pool import PdfRenderPool, RenderQueueFullError, render_pool
 
-__all__ = ["PdfInvoiceRenderer"]
+__all__ = [
+    "PdfInvoiceRenderer", "PdfRenderPool", "RenderQueueFullError", "RenderTemplate", "invoice_renderer", "render_pool"
+]
@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import getLogger
+from threading import Lock
+from typing import Iterable, Optional
+
+import invoice_utils.config as config
+from invoice_utils.render._render import invoice_renderer
+
+
+class RenderQueueFullError(Exception):
+    def __init__(self, message: str):
+        self.message = message
+
+
+def _init_worker(template_names: tuple[str, ...]):
+    for template_name in template_names:
+        invoice_renderer(template_name).warm()
+
+
+def _render(template_name: str, context: dict, output_path: str, persist: bool) -> bytes:
+    return invoice_renderer(template_name).render(context, output_path, persist)
+
+
+class PdfRenderPool:
+    def __init__(self, workers: int, max_pending: int, template_names: Iterable[str] = ("invoice",)):
+        self._log = getLogger(self.__class__.__name__)
+        self._workers = workers
+        self._max_pending = max_pending
+        self._template_names = tuple(template_names)
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self):
+        if self._workers == 0:
+            return
+        executor = self._pool()
+        for _ in range(self._workers):
+            executor.submit(os.getpid)
+
+    async def stop(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+
+    async def render(self, template_name: str, context: dict, output_path: str, persist: bool = False) -> bytes:
+        if self._pending >= self._max_pending:
+            raise RenderQueueFullError(f"{self._pending} invoices are already waiting to be rendered.")
+        self._pending += 1
+        try:
+            if self._workers == 0:
+                return await asyncio.to_thread(invoice_renderer(template_name).render, context, output_path, persist)
+            return await self._submit(template_name, context, output_path, persist)
+        finally:
+            self._pending -= 1
+
+    async def _submit(self, *args) -> bytes:
+        executor = self._pool()
+        try:
+            return await asyncio.wrap_future(executor.submit(_render, *args))
+        except BrokenProcessPool:
+            self._log.warning("PDF render worker crashed, restarting the render pool")
+            self._restart(executor)
+        return await asyncio.wrap_future(self._pool().submit(_render, *args))
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self._template_names,),
+                )
+            return self._executor
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+_render_pool: Optional[PdfRenderPool] = None
+_render_pool_lock = Lock()
+
+
+def render_pool() -> PdfRenderPool:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = PdfRenderPool(config.INVOICE_UTILS_RENDER_WORKERS, config.INVOICE_UTILS_RENDER_QUEUE_SIZE)
+        return _render_pool
@@ -1,7 +1,18 @@
+from enum import StrEnum
 from pathlib import Path
+from threading import Lock
+from typing import Iterable, Optional
 
 import jinja2
 import weasyprint
+from weasyprint.text.fonts import FontConfiguration
+
+_TEMPLATES_PATH = Path(__file__).parent / "templates"
+
+
+class RenderTemplate(StrEnum):
+    BASE = "invoice"
+    ROMANIAN = "invoice_ro-RO"
 
 
 def datetime_format(value, fmt="%d.%m.%Y"):
@@ -12,27 +23,93 @@ def number_format(value, fmt="%.2f"):
     return fmt % float(value)
 
 
+class _TemplateCache:
+    def __init__(self, templates_path: Path):
+        self.templates_path = templates_path
+        self.font_config = FontConfiguration()
+        self._jinja_env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(searchpath=templates_path),
+            autoescape=jinja2.select_autoescape(["html", "jinja"]),
+        )
+        self._jinja_env.filters["datetime_format"] = datetime_format
+        self._jinja_env.filters["number_format"] = number_format
+        self._stylesheets: dict[str, tuple[int, weasyprint.CSS]] = {}
+        self._stylesheet_sources: dict[str, tuple[int, str]] = {}
+        self._lock = Lock()
+
+    def template(self, template_name: str) -> jinja2.Template:
+        return self._jinja_env.get_template(template_name + ".jinja")
+
+    def stylesheet(self, template_name: str) -> weasyprint.CSS:
+        css_file_path = self.templates_path / (template_name + ".css")
+        mtime = css_file_path.stat().st_mtime_ns
+        with self._lock:
+            cached = self._stylesheets.get(template_name)
+            if cached is None or cached[0] != mtime:
+                cached = mtime, weasyprint.CSS(filename=css_file_path, font_config=self.font_config)
+                self._stylesheets[template_name] = cached
+            return cached[1]
+
+    def stylesheet_source(self, template_name: str) -> str:
+        css_file_path = self.templates_path / (template_name + ".css")
+        mtime = css_file_path.stat().st_mtime_ns
+        with self._lock:
+            cached = self._stylesheet_sources.get(template_name)
+            if cached is None or cached[0] != mtime:
+                cached = mtime, css_file_path.read_text()
+                self._stylesheet_sources[template_name] = cached
+            return cached[1]
+
+
+_template_cache = _TemplateCache(_TEMPLATES_PATH)
+
+
 class PdfInvoiceRenderer:
-    def __init__(self, template_name: str):
-        self.__templates_path = Path(__file__).parent / "templates"
-        self.__jinja_template = template_name + ".jinja"
-        self.__css_file = template_name + ".css"
+    def __init__(self, template_name: str, templates: Optional[_TemplateCache] = None):
+        self.__templates = templates or _template_cache
+        self.__template_name = template_name
+
+    def warm(self):
+        self.__templates.template(self.__template_name)
+        self.__templates.stylesheet(self.__template_name)
+
+    def render_html(self, context: dict, inline_stylesheet: bool = False) -> str:
+        html = self.__templates.template(self.__template_name).render(**context)
+        if inline_stylesheet:
+            style = f"<style>\n{self.__templates.stylesheet_source(self.__template_name)}</style>\n"
+            html = html.replace("</head>", style + "</head>", 1)
+        return html
 
     def render(self, context: dict, output_path: str, persist: bool = False):
-        loader = jinja2.FileSystemLoader(searchpath=self.__templates_path)
-        jinja_env = jinja2.Environment(loader=loader)
-        jinja_env.filters["datetime_format"] = datetime_format
-        jinja_env.filters["number_format"] = number_format
-        html_template = jinja_env.get_template(self.__jinja_template)
-
-        printer = weasyprint.HTML(string=html_template.render(
-            **context
-        ))
-        css_file_path = self.__templates_path / self.__css_file
-        stylesheet = weasyprint.CSS(filename=css_file_path)
-        document = printer.render(stylesheets=[stylesheet])
-        content = document.write_pdf()
+        return self.__write(self.__layout(context).write_pdf(), output_path, persist)
+
+    def render_many(self, contexts: Iterable[dict], output_path: str, persist: bool = False) -> bytes:
+        documents = [self.__layout(context) for context in contexts]
+        if not documents:
+            raise ValueError("No invoices to render.")
+        pages = [page for document in documents for page in document.pages]
+        return self.__write(documents[0].copy(pages).write_pdf(), output_path, persist)
+
+    def __layout(self, context: dict) -> weasyprint.Document:
+        printer = weasyprint.HTML(string=self.render_html(context))
+        stylesheet = self.__templates.stylesheet(self.__template_name)
+        return printer.render(stylesheets=[stylesheet], font_config=self.__templates.font_config)
+
+    @staticmethod
+    def __write(content: bytes, output_path: str, persist: bool) -> bytes:
         if persist:
             with open(output_path, "wb") as f:
                 f.write(content)
         return content
+
+
+_renderers: dict[str, PdfInvoiceRenderer] = {}
+_renderers_lock = Lock()
+
+
+def invoice_renderer(template_name: str) -> PdfInvoiceRenderer:
+    with _renderers_lock:
+        renderer = _renderers.get(template_name)
+        if renderer is None:
+            renderer = _renderers[template_name] = PdfInvoiceRenderer(template_name)
+        return renderer
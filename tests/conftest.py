@@ -0,0 +1,25 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark")
+    group.addoption("--benchmark", action="store_true", default=False, help="run the performance benchmarks")
+    group.addoption(
+        "--benchmark-max-lines", type=int, default=100_000,
+        help="largest invoice size (line items) used by the benchmarks"
+    )
+    group.addoption("--benchmark-save", metavar="NAME", help="save benchmark results as baseline NAME")
+    group.addoption("--benchmark-compare", metavar="NAME", help="compare benchmark results with baseline NAME")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: performance benchmark, runs only with --benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run only with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
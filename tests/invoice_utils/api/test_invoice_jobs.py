@@ -0,0 +1,144 @@
+import time
+from pathlib import Path
+
+import pytest
+
+import invoice_utils.depends as di
+from invoice_utils.dal import InvoiceJob
+from invoice_utils.render import RenderQueueFullError
+
+CREATE_INVOICE_PATH = "/api/v1/invoices/?async=true"
+
+
+@pytest.fixture
+def invoice_dir(http, tmp_path, monkeypatch):
+    from invoice_utils import config
+    result = tmp_path / "invoices"
+    result.mkdir()
+    monkeypatch.setattr(config, "INVOICE_UTILS_INVOICE_DIR", str(result))
+    return result
+
+
+@pytest.fixture
+def mock_render(mocker):
+    def render(context, output_path, persist=False):
+        if persist:
+            Path(output_path).write_bytes(b"test pdf content")
+        return b"test pdf content"
+    return mocker.patch("invoice_utils.render._render.PdfInvoiceRenderer.render", side_effect=render)
+
+
+def _wait_for(http, location: str) -> dict:
+    deadline = time.monotonic() + 5
+    while True:
+        status = http.get(location).json()
+        if status["status"] in ("done", "failed") or time.monotonic() > deadline:
+            return status
+        time.sleep(0.01)
+
+
+def test_async_invoice_returns_202_with_job(http, invoice_dir, mock_render, invoice_request_body):
+    with http:
+        res = http.post(CREATE_INVOICE_PATH, json=invoice_request_body)
+        status = _wait_for(http, res.headers["Location"])
+
+    assert res.status_code == 202
+    assert res.json()["status"] == "pending"
+    assert res.headers["Location"].endswith(f"/api/v1/invoices/jobs/{res.json()['id']}")
+    assert status["status"] == "done"
+    assert status["error"] is None
+    assert status["download"].endswith(f"/api/v1/invoices/jobs/{res.json()['id']}/pdf")
+
+
+def test_download_pdf_of_finished_job(http, invoice_dir, mock_render, invoice_request_body):
+    with http:
+        res = http.post(CREATE_INVOICE_PATH, json=invoice_request_body)
+        status = _wait_for(http, res.headers["Location"])
+        download = http.get(status["download"])
+
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/pdf"
+    assert download.content == b"test pdf content"
+    assert (invoice_dir / f"20231114-0001-{res.json()['id']}-invoice.pdf").exists()
+
+
+def test_jobs_for_the_same_invoice_number_keep_separate_files(http, invoice_dir, mock_render, invoice_request_body):
+    with http:
+        jobs = [http.post(CREATE_INVOICE_PATH, json=invoice_request_body).json()["id"] for _ in range(2)]
+        statuses = [_wait_for(http, f"/api/v1/invoices/jobs/{job_id}") for job_id in jobs]
+
+    assert [status["status"] for status in statuses] == ["done", "done"]
+    assert sorted(path.name for path in invoice_dir.iterdir()) == sorted(
+        f"20231114-0001-{job_id}-invoice.pdf" for job_id in jobs
+    )
+
+
+def test_failed_job_reports_error(http, tmp_path, mock_render, invoice_request_body, monkeypatch):
+    from invoice_utils import config
+    monkeypatch.setattr(config, "INVOICE_UTILS_INVOICE_DIR", str(tmp_path / "missing"))
+
+    with http:
+        res = http.post(CREATE_INVOICE_PATH, json=invoice_request_body)
+        status = _wait_for(http, res.headers["Location"])
+        download = http.get(f"/api/v1/invoices/jobs/{res.json()['id']}/pdf")
+
+    assert status["status"] == "failed"
+    assert status["error"] == "No local storage available for invoices"
+    assert status["download"] is None
+    assert download.status_code == 409
+
+
+def test_async_invoice_validates_address_before_queueing(http, mock_render, invoice_request_body):
+    invoice_request_body["send_mail"] = True
+
+    res = http.post(CREATE_INVOICE_PATH, json=invoice_request_body)
+
+    assert res.status_code == 422
+    assert di.invoice_job_repo().list() == []
+
+
+def test_unknown_job_returns_404(http):
+    res = http.get("/api/v1/invoices/jobs/unknown")
+
+    assert res.status_code == 404
+    assert res.json() == {"detail": "Invoice job does not exist."}
+
+
+def test_pending_jobs_are_requeued_on_startup(http, invoice_dir, mock_render, invoice_request_body, default_template):
+    job = di.invoice_job_repo().create(InvoiceJob(request=invoice_request_body, rule_template=default_template))
+
+    with http:
+        status = _wait_for(http, f"/api/v1/invoices/jobs/{job.id}")
+
+    assert status["status"] == "done"
+    assert mock_render.call_args.args[0]["header"]["number"] == 1
+
+
+def test_jobs_leased_by_live_workers_are_not_rerun_on_startup(
+    http, invoice_dir, mock_render, invoice_request_body, default_template
+):
+    repo = di.invoice_job_repo()
+    job = repo.create(InvoiceJob(request=invoice_request_body, rule_template=default_template))
+    repo.claim(job.id, "other-worker", 60)
+
+    with http:
+        status = http.get(f"/api/v1/invoices/jobs/{job.id}").json()
+
+    assert status["status"] == "running"
+    mock_render.assert_not_called()
+
+
+def test_job_fails_when_render_queue_stays_full(http, invoice_dir, mocker, monkeypatch, invoice_request_body):
+    from invoice_utils.api import _invoices
+    monkeypatch.setattr(_invoices, "_RENDER_QUEUE_FULL_RETRY_SECONDS", 0)
+    monkeypatch.setattr(_invoices, "_RENDER_QUEUE_FULL_ATTEMPTS", 3)
+    render_pool = mocker.patch("invoice_utils.api._invoices.render_pool")
+    render_pool.return_value.render.side_effect = RenderQueueFullError("full")
+
+    with http:
+        res = http.post(CREATE_INVOICE_PATH, json=invoice_request_body)
+        status = _wait_for(http, res.headers["Location"])
+
+    assert status["status"] == "failed"
+    assert status["error"] == "Render queue stayed full after 3 attempts."
+    assert render_pool.return_value.render.call_count == 3
@@ -0,0 +1,82 @@
+import pytest
+
+from invoice_utils.dal import Template
+
+PREVIEW_INVOICE_PATH = "/api/v1/invoices/preview"
+
+
+@pytest.fixture
+def header_template():
+    party = {
+        "name": "p", "address": "a", "bank": {"name": "b", "iban": "i"},
+        "taxInfo": {"vatId": "RO1", "registrationNumber": "J1"},
+    }
+    return Template(name="header", rules=[{"type": "header", "buyer": party, "seller": party}])
+
+
+@pytest.mark.parametrize("template,title", [("invoice", "Invoice 1 / 14.11.2023"), ("invoice_ro-RO", "Factura 1 / 14.11.2023")])
+def test_preview_returns_rendered_html(
+    http, mocker, template_repo, header_template, invoice_request_body, template, title
+):
+    template_repo.get_by_key.return_value = (True, header_template)
+    render = mocker.patch("invoice_utils.render._render.PdfInvoiceRenderer.render")
+
+    res = http.post(PREVIEW_INVOICE_PATH, params={"template": template}, json=invoice_request_body)
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/html")
+    assert title in res.text
+    assert "<style>" in res.text
+    assert "Some t" in res.text
+    render.assert_not_called()
+
+
+def test_preview_rejects_unknown_template(http, invoice_request_body):
+    res = http.post(PREVIEW_INVOICE_PATH, params={"template": "unknown"}, json=invoice_request_body)
+
+    assert res.status_code == 422
+
+
+def test_preview_requires_existing_rule_template(http, template_repo, invoice_request_body):
+    template_repo.get_by_key.return_value = (False, None)
+
+    res = http.post(PREVIEW_INVOICE_PATH, json=invoice_request_body)
+
+    assert res.status_code == 400
+    assert res.json() == {"detail": "Rule Template does not exist."}
+
+
+def test_preview_rejects_invalid_item_operation(http, template_repo, invoice_request_body):
+    template_repo.get_by_key.return_value = (True, Template(name="broken", rules=[
+        {"type": "item_op", "name": "vat", "operation": "^", "value": "19"}
+    ]))
+
+    res = http.post(PREVIEW_INVOICE_PATH, json=invoice_request_body)
+
+    assert res.status_code == 422
+    assert res.json() == {"detail": "item operation 'vat' has unknown operation '^'"}
+
+
+@pytest.mark.parametrize("provider,detail", [
+    ({"type": "ecb"}, "fx-rate rule: unknown FX rate provider 'ecb'"),
+    ({"type": "file"}, "fx-rate rule: FX rate provider 'file' is missing 'path'"),
+])
+def test_preview_rejects_invalid_fx_provider(http, template_repo, invoice_request_body, provider, detail):
+    template_repo.get_by_key.return_value = (True, Template(name="broken", rules=[
+        {"type": "fx-rate", "symbol": "EUR", "providers": [provider]}
+    ]))
+
+    res = http.post(PREVIEW_INVOICE_PATH, json=invoice_request_body)
+
+    assert res.status_code == 422
+    assert res.json() == {"detail": detail}
+
+
+def test_preview_escapes_request_fields(http, invoice_request_body):
+    invoice_request_body["items"][0]["text"] = "<script>alert(1)</script>"
+
+    res = http.post(PREVIEW_INVOICE_PATH, json=invoice_request_body)
+
+    assert res.status_code == 200
+    assert "<script>" not in res.text
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in res.text
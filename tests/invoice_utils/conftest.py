@@ -1,5 +1,6 @@
 import json
 import pathlib
+from decimal import Decimal
 from importlib import reload
 from unittest.mock import patch, MagicMock
 
@@ -7,9 +8,42 @@ from fastapi.testclient import TestClient
 import pytest
 
 from invoice_utils.dal import Template, Repository
+from invoice_utils.fx import bnr_rates
+from invoice_utils.models import InvoicedItem
 import invoice_utils.depends as di
 
 
+@pytest.fixture(autouse=True)
+def fx_cache_dir(tmp_path, monkeypatch):
+    from invoice_utils import config
+    cache_dir = tmp_path / "fx-cache"
+    monkeypatch.setenv("INVOICE_UTILS_FX_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("INVOICE_UTILS_FX_PREFETCH", "False")
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_PREFETCH", False)
+    bnr_rates().clear()
+    yield cache_dir
+    bnr_rates().clear()
+
+
+@pytest.fixture(autouse=True)
+def invoice_job_store(tmp_path, monkeypatch):
+    from invoice_utils import config
+    store_path = tmp_path / "invoice-jobs.sqlite3"
+    monkeypatch.setenv("INVOICE_UTILS_JOB_STORE", str(store_path))
+    monkeypatch.setattr(config, "INVOICE_UTILS_JOB_STORE", str(store_path))
+    return store_path
+
+
+@pytest.fixture(autouse=True)
+def render_workers(monkeypatch):
+    from invoice_utils import config
+    from invoice_utils.render import _pool
+    monkeypatch.setenv("INVOICE_UTILS_RENDER_WORKERS", "0")
+    monkeypatch.setattr(config, "INVOICE_UTILS_RENDER_WORKERS", 0)
+    monkeypatch.setattr(_pool, "_render_pool", None)
+
+
 @pytest.fixture(scope="session")
 def data_dir():
     return pathlib.Path(__file__).parent.parent / "data"
@@ -38,6 +72,39 @@ def basic_rules(read_text):
     return json.loads(read_text("basic.json"))
 
 
+@pytest.fixture(scope="session")
+def invoiced_items():
+    def f(count: int) -> list[InvoicedItem]:
+        return [
+            InvoicedItem(f"item {index}", Decimal(index % 7 + 1), Decimal(f"{index % 997}.{index % 100:02}"))
+            for index in range(count)
+        ]
+    return f
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock(1000.0)
+
+
+@pytest.fixture
+def invoice_request_body():
+    return {
+        "header": {"number": "1", "timestamp": "2023-11-14T09:00:00+00:00", "items": []},
+        "buyer": {"name": "a", "address": "b", "tax_info": {"id": "c"}},
+        "seller": {"name": "a", "address": "b", "tax_info": {"id": "c"}},
+        "items": [{"text": "Some t", "quantity": "2", "unit_price": "45"}],
+    }
+
+
 @pytest.fixture()
 def environment(monkeypatch, request):
     if hasattr(request, "param"):
@@ -0,0 +1,143 @@
+
+import pytest
+
+from invoice_utils.dal import InvoiceJob, InvoiceJobSqliteRepository, InvoiceJobStatus, Template
+
+
+@pytest.fixture
+def sut(tmp_path, clock):
+    return InvoiceJobSqliteRepository(tmp_path / "jobs.sqlite3", clock)
+
+
+def _job(number: str = "1") -> InvoiceJob:
+    return InvoiceJob(
+        request={"header": {"number": number}, "items": []},
+        rule_template=Template(name="basic", rules=[{"type": "item_op"}]),
+    )
+
+
+def test_create_and_get_by_key_round_trip(sut):
+    job = sut.create(_job())
+
+    found, stored = sut.get_by_key(job.id)
+
+    assert found
+    assert stored == job
+    assert stored.status == InvoiceJobStatus.PENDING
+    assert sut.exists(job.id)
+
+
+def test_get_by_key_of_missing_job(sut):
+    assert sut.get_by_key("missing") == (False, None)
+    assert not sut.exists("missing")
+
+
+def test_jobs_survive_reopening_the_store(sut, tmp_path):
+    job = sut.create(_job())
+
+    assert InvoiceJobSqliteRepository(tmp_path / "jobs.sqlite3").get_by_key(job.id) == (True, job)
+
+
+def test_update_stores_result(sut):
+    job = sut.create(_job())
+    job.status, job.invoice_path = InvoiceJobStatus.DONE, "invoices/20231114-0001-invoice.pdf"
+
+    sut.update(job.id, job)
+
+    _, stored = sut.get_by_key(job.id)
+    assert stored.status == InvoiceJobStatus.DONE
+    assert stored.invoice_path == "invoices/20231114-0001-invoice.pdf"
+    assert stored.updated >= stored.created
+
+
+def test_claim_runs_a_pending_job_once(sut):
+    job = sut.create(_job())
+
+    claimed = sut.claim(job.id, "worker-1", 60)
+
+    assert claimed.status == InvoiceJobStatus.RUNNING
+    assert sut.claim(job.id, "worker-2", 60) is None
+    assert sut.claim("missing", "worker-1", 60) is None
+
+
+def test_requeue_keeps_jobs_with_live_leases(sut, clock):
+    pending, running, done = sut.create(_job("1")), sut.create(_job("2")), sut.create(_job("3"))
+    sut.claim(running.id, "worker-1", 60)
+    done.status = InvoiceJobStatus.DONE
+    sut.update(done.id, done)
+
+    clock.now += 59
+
+    assert [job.id for job in sut.requeue(include_pending=True)] == [pending.id]
+    assert sut.get_by_key(running.id)[1].status == InvoiceJobStatus.RUNNING
+
+
+def test_requeue_returns_jobs_with_expired_leases(sut, clock):
+    pending, running = sut.create(_job("1")), sut.create(_job("2"))
+    sut.claim(running.id, "worker-1", 60)
+
+    clock.now += 61
+    requeued = sut.requeue(include_pending=True)
+
+    assert [job.id for job in requeued] == [pending.id, running.id]
+    assert {job.status for job in requeued} == {InvoiceJobStatus.PENDING}
+    assert sut.claim(running.id, "worker-2", 60).status == InvoiceJobStatus.RUNNING
+
+
+def test_requeue_returns_only_reset_jobs_after_startup(sut, clock):
+    sut.create(_job("1"))
+    first, second = sut.create(_job("2")), sut.create(_job("3"))
+    sut.claim(second.id, "worker-1", 60)
+    sut.claim(first.id, "worker-1", 60)
+
+    clock.now += 61
+    requeued = sut.requeue()
+
+    assert [job.id for job in requeued] == [first.id, second.id]
+    assert sut.requeue() == []
+
+
+def test_renew_extends_the_lease_of_the_owner_only(sut, clock):
+    job = sut.create(_job())
+    sut.claim(job.id, "worker-1", 60)
+
+    clock.now += 50
+    assert sut.renew(job.id, "worker-1", 60)
+    assert not sut.renew(job.id, "worker-2", 60)
+    clock.now += 50
+
+    assert sut.requeue() == []
+
+
+def test_finish_stores_the_result_of_the_lease_owner(sut):
+    job = sut.create(_job())
+    claimed = sut.claim(job.id, "worker-1", 60)
+    claimed.status, claimed.invoice_path = InvoiceJobStatus.DONE, "invoices/20231114-0001-invoice.pdf"
+
+    assert not sut.finish(job.id, "worker-2", claimed)
+    assert sut.finish(job.id, "worker-1", claimed)
+
+    _, stored = sut.get_by_key(job.id)
+    assert stored.status == InvoiceJobStatus.DONE
+    assert stored.invoice_path == "invoices/20231114-0001-invoice.pdf"
+
+
+def test_finish_is_rejected_after_the_lease_expired(sut, clock):
+    job = sut.create(_job())
+    claimed = sut.claim(job.id, "worker-1", 60)
+    clock.now += 61
+    sut.requeue()
+    sut.claim(job.id, "worker-2", 60)
+    claimed.status, claimed.error = InvoiceJobStatus.FAILED, "late"
+
+    assert not sut.finish(job.id, "worker-1", claimed)
+    assert sut.get_by_key(job.id)[1].status == InvoiceJobStatus.RUNNING
+
+
+def test_list_and_delete(sut):
+    first, second = sut.create(_job("1")), sut.create(_job("2"))
+
+    assert [job.id for job in sut.list()] == [first.id, second.id]
+    assert sut.delete(first.id)
+    assert not sut.delete(first.id)
+    assert [job.id for job in sut.list()] == [second.id]
@@ -0,0 +1,121 @@
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+_BASELINE_DIR = Path(__file__).parents[4] / ".benchmarks" / "engine"
+_MIN_MEASURE_SECONDS = 0.5
+_MAX_ROUNDS = 10
+
+
+class BenchmarkRecorder:
+    def __init__(self):
+        self.results = {}
+
+    def measure(self, case: str, sweep: str, params: dict, func) -> dict:
+        func()
+        rounds, elapsed, timings = 0, 0.0, []
+        while rounds < _MAX_ROUNDS and (rounds == 0 or elapsed < _MIN_MEASURE_SECONDS):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+            elapsed += timings[-1]
+            rounds += 1
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result = {
+            "sweep": sweep,
+            "params": params,
+            "rounds": rounds,
+            "min_seconds": min(timings),
+            "mean_seconds": elapsed / rounds,
+            "peak_bytes": peak,
+        }
+        self.results[case] = result
+        return result
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _baseline_path(name: str) -> Path:
+    return _BASELINE_DIR / f"{name}.json"
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(request):
+    recorder = BenchmarkRecorder()
+    request.config.stash[_recorder_key] = recorder
+    yield recorder
+    name = request.config.getoption("--benchmark-save")
+    if name and recorder.results:
+        _BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        _baseline_path(name).write_text(json.dumps({
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "results": recorder.results,
+        }, indent=4))
+
+
+@pytest.fixture(scope="session")
+def benchmark_max_lines(request) -> int:
+    return request.config.getoption("--benchmark-max-lines")
+
+
+_recorder_key = pytest.StashKey[BenchmarkRecorder]()
+
+
+def _format_row(case: str, result: dict, baseline: dict) -> str:
+    row = f"{case:<48} {result['min_seconds'] * 1000:>11.2f} {result['peak_bytes'] / 2 ** 20:>10.2f}"
+    previous = baseline.get(case)
+    if previous:
+        row += (
+            f" {result['min_seconds'] / previous['min_seconds']:>8.2f}x"
+            f" {result['peak_bytes'] / max(previous['peak_bytes'], 1):>8.2f}x"
+        )
+    return row
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    recorder = config.stash.get(_recorder_key, None)
+    if recorder is None or not recorder.results:
+        return
+    baseline = {}
+    compare = config.getoption("--benchmark-compare")
+    if compare:
+        path = _baseline_path(compare)
+        if path.exists():
+            baseline = json.loads(path.read_text())["results"]
+        else:
+            terminalreporter.write_line(f"benchmark baseline {path} not found")
+
+    header = f"{'case':<48} {'min ms':>11} {'peak MiB':>10}"
+    if baseline:
+        header += f" {'time':>9} {'memory':>9}"
+    sweeps = {}
+    for case, result in recorder.results.items():
+        sweeps.setdefault(result["sweep"], []).append(case)
+    for sweep, cases in sweeps.items():
+        terminalreporter.write_sep("-", f"engine benchmark: {sweep}")
+        terminalreporter.write_line(header)
+        for case in cases:
+            terminalreporter.write_line(_format_row(case, recorder.results[case], baseline))
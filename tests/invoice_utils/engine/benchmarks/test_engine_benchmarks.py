@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+
+from invoice_utils.engine import InvoicingEngine
+
+pytestmark = pytest.mark.benchmark
+
+INVOICE_DATE = datetime(2011, 11, 11)
+LINE_COUNTS = (10, 100, 1_000, 10_000, 100_000)
+ITEM_OP_COUNTS = (0, 1, 4, 16)
+CURRENCY_COUNTS = (0, 1, 4, 16)
+SWEEP_LINES = 10_000
+
+
+def _rules(item_ops: int, currencies: int, bnr: bool = False) -> list[dict]:
+    rules = [{"type": "currency", "main": {"symbol": "EUR"}, "secondary": [
+        {"symbol": f"C{index:02}", "rate": f"{4.5 + index / 10:.2f}"} for index in range(currencies)
+    ]}]
+    if bnr:
+        rules.append({"type": "bnr-fx-rate", "symbol": "EUR"})
+    rules.extend(
+        {"type": "item_op", "name": f"tax-{index}", "operation": "*", "value": f"0.{index + 1:02}"}
+        for index in range(item_ops)
+    )
+    return rules
+
+
+def _run(benchmark_recorder, invoiced_items, case: str, sweep: str, rules: list[dict], lines: int):
+    engine = InvoicingEngine(rules)
+    items = invoiced_items(lines)
+    params = {
+        "lines": lines,
+        "item_ops": sum(rule["type"] == "item_op" for rule in rules),
+        "currencies": len(rules[0]["secondary"]),
+    }
+    result = benchmark_recorder.measure(case, sweep, params, lambda: engine.process(1, INVOICE_DATE, items))
+    assert result["min_seconds"] > 0
+
+
+@pytest.mark.parametrize("lines", LINE_COUNTS)
+def test_scaling_with_line_items(benchmark_recorder, invoiced_items, benchmark_max_lines, lines):
+    if lines > benchmark_max_lines:
+        pytest.skip(f"{lines} lines is above --benchmark-max-lines")
+    _run(benchmark_recorder, invoiced_items, f"lines={lines}", "line items", _rules(1, 1), lines)
+
+
+@pytest.mark.parametrize("item_ops", ITEM_OP_COUNTS)
+def test_scaling_with_item_operations(benchmark_recorder, invoiced_items, item_ops):
+    _run(
+        benchmark_recorder, invoiced_items, f"item_ops={item_ops} lines={SWEEP_LINES}", "item operations",
+        _rules(item_ops, 1), SWEEP_LINES
+    )
+
+
+@pytest.mark.parametrize("currencies", CURRENCY_COUNTS)
+def test_scaling_with_currencies(benchmark_recorder, invoiced_items, currencies):
+    _run(
+        benchmark_recorder, invoiced_items, f"currencies={currencies} lines={SWEEP_LINES}", "secondary currencies",
+        _rules(1, currencies), SWEEP_LINES
+    )
+
+
+@pytest.mark.parametrize("lines", (10, SWEEP_LINES))
+def test_bnr_fx_rates(benchmark_recorder, invoiced_items, responses, read_text, lines):
+    responses.get(
+        f"https://bnr.ro/files/xml/years/nbrfxrates{INVOICE_DATE.year}.xml",
+        content_type="text/xml",
+        body=read_text("bnr-response-1-item.xml"),
+    )
+    _run(benchmark_recorder, invoiced_items, f"bnr lines={lines}", "bnr fx rates", _rules(1, 0, bnr=True), lines)
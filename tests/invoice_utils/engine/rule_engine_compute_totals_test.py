@@ -30,3 +30,32 @@ def test_process_computes_totals(basic_rules):
          "name": "vat",
          "value": Decimal("2.3")
     }]
+
+
+def test_process_accumulates_totals_per_tax_name_and_currency():
+    engine = InvoicingEngine([
+        {
+            "type": "currency",
+            "main": {"symbol": "EUR"},
+            "secondary": [{"symbol": "RON", "rate": "5"}, {"symbol": "USD", "rate": "1.1"}],
+        },
+        {"type": "item_op", "name": "vat", "operation": "*", "value": "0.1"},
+        {"type": "item_op", "name": "eco", "operation": "*", "value": "0.01"},
+        {"type": "item_op", "name": "vat", "operation": "*", "value": "0.09"},
+    ])
+
+    output = engine.process(1, datetime.now(), [
+        InvoicedItem("a", Decimal(1), Decimal(10)),
+        InvoicedItem("b", Decimal(3), Decimal(5)),
+    ])
+
+    assert output["totals"]["price"] == Decimal(25)
+    assert output["totals"]["total"] == Decimal("30")
+    assert output["totals"]["taxes"] == [
+        {"name": "vat", "value": Decimal("4.75")},
+        {"name": "eco", "value": Decimal("0.25")},
+    ]
+    assert [(t["currency"], t["price"], t["total"]) for t in output["totals"]["extra"]["currencies"]] == [
+        ("RON", Decimal(125), Decimal(150)),
+        ("USD", Decimal("27.5"), Decimal(33)),
+    ]
@@ -142,3 +142,19 @@ def test_engine_bnr_invoice_date_is_not_found(engine, invoiced_item, bnr_res, in
 
     assert result["header"]["currency"]["exchangeRates"] == {}
     assert caplog.messages[0] == f"can't find BNR fx rates for {invoice_date.strftime('%Y-%m-%d')}"
+
+
+def test_engine_process_many_reuses_bnr_rates_for_same_date(engine, invoiced_item, bnr_res):
+    invoices = [
+        (invoice_no, invoice_date, [invoiced_item])
+        for invoice_no, invoice_date in enumerate(
+            [TEST_INVOICE_DATE, datetime(2011, 11, 12), TEST_INVOICE_DATE], start=1
+        )
+    ]
+
+    results = list(engine.process_many(invoices))
+
+    assert bnr_res.call_count == 1
+    assert [r["header"]["currency"]["exchangeRates"] for r in results] == [
+        {"RON": Decimal("4.9273")}
+    ] * 3
@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+from invoice_utils.engine import InvoicingEngine
+from invoice_utils.models import InvoicedItem
+
+
+THREADS = 32
+INVOICES_PER_THREAD = 20
+
+
+def _invoice_input(invoice_no: int):
+    items = [
+        InvoicedItem(f"item {invoice_no}-{i}", Decimal(i + 1), Decimal(invoice_no) + Decimal("0.25"))
+        for i in range(invoice_no % 7 + 1)
+    ]
+    return invoice_no, datetime(2022, 1, invoice_no % 28 + 1), items
+
+
+def test_shared_engine_produces_identical_results_across_threads(basic_rules):
+    inputs = [_invoice_input(no) for no in range(1, THREADS * INVOICES_PER_THREAD + 1)]
+    expected = [InvoicingEngine(basic_rules).process(*args) for args in inputs]
+    shared_engine = InvoicingEngine(basic_rules)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        actual = list(executor.map(lambda args: shared_engine.process(*args), inputs))
+
+    assert actual == expected
+
+
+def test_consecutive_calls_do_not_share_invoice_state(basic_rules):
+    engine = InvoicingEngine(basic_rules)
+
+    first = engine.process(*_invoice_input(1))
+    second = engine.process(*_invoice_input(2))
+
+    assert first is not second
+    assert first["header"]["number"] == 1
+    assert len(first["items"]) == 2
+    assert len(second["items"]) == 3
@@ -0,0 +1,57 @@
+import logging
+from datetime import datetime
+
+from invoice_utils.engine import EngineObserver, InvoicingEngine, LoggingEngineObserver
+
+
+class RecordingObserver(EngineObserver):
+    def __init__(self):
+        self.stages = []
+        self.invoices = []
+
+    def on_stage(self, invoice_no, stage, seconds):
+        self.stages.append((invoice_no, stage, seconds))
+
+    def on_invoice(self, invoice_no, items, currencies, seconds):
+        self.invoices.append((invoice_no, items, currencies, seconds))
+
+
+def test_observer_receives_stage_timings(basic_rules, invoiced_items):
+    observer = RecordingObserver()
+    engine = InvoicingEngine(basic_rules, observer=observer)
+
+    engine.process(7, datetime(2022, 1, 15), invoiced_items(3))
+
+    assert [(no, stage) for no, stage, _ in observer.stages] == [
+        (7, "HeaderRule"), (7, "CurrencyRule"), (7, "FxRateRule"), (7, "items"), (7, "totals"),
+    ]
+    assert all(seconds >= 0 for _, _, seconds in observer.stages)
+    assert [invoice[:3] for invoice in observer.invoices] == [(7, 3, 1)]
+    assert observer.invoices[0][3] >= sum(seconds for _, _, seconds in observer.stages)
+
+
+def test_observer_reports_streamed_invoice_after_consumption(basic_rules, invoiced_items):
+    observer = RecordingObserver()
+    stream = InvoicingEngine(basic_rules, observer=observer).stream(1, datetime(2022, 1, 15), iter(invoiced_items(5)))
+
+    assert [stage for _, stage, _ in observer.stages] == ["HeaderRule", "CurrencyRule", "FxRateRule"]
+    assert len(list(stream)) == 5
+    assert [invoice[:3] for invoice in observer.invoices] == [(1, 5, 1)]
+
+
+def test_observer_does_not_change_results(basic_rules, invoiced_items):
+    items = invoiced_items(4)
+    plain = InvoicingEngine(basic_rules).process(1, datetime(2022, 1, 15), items)
+    observed = InvoicingEngine(basic_rules, observer=RecordingObserver()).process(1, datetime(2022, 1, 15), items)
+
+    assert observed == plain
+
+
+def test_logging_observer(basic_rules, invoiced_items, caplog):
+    engine = InvoicingEngine(basic_rules, observer=LoggingEngineObserver())
+
+    with caplog.at_level(logging.DEBUG, logger="LoggingEngineObserver"):
+        engine.process(3, datetime(2022, 1, 15), invoiced_items(2))
+
+    assert any(message.startswith("invoice 3: FxRateRule took") for message in caplog.messages)
+    assert caplog.messages[-1].startswith("invoice 3: processed 2 items in 1 secondary currencies in")
@@ -0,0 +1,29 @@
+from datetime import datetime
+from decimal import Decimal
+
+from invoice_utils.engine import InvoicingEngine
+from invoice_utils.engine._plan import ExecutionPlan
+from invoice_utils.models import InvoicedItem
+
+
+def test_plan_compiles_item_operations_in_template_order():
+    plan = ExecutionPlan.compile([
+        {"type": "item_op", "name": "vat", "operation": "*", "value": "0.19"},
+        {"type": "item_op", "name": "fee", "operation": "+", "value": "1.5"},
+    ])
+
+    assert [op.name for op in plan.item_ops] == ["vat", "fee"]
+    assert plan.item_ops[0].apply(Decimal("10")) == Decimal("1.9")
+    assert plan.item_ops[1].apply(Decimal("10")) == Decimal("11.5")
+
+
+def test_engine_uses_rules_compiled_at_construction(basic_rules):
+    engine = InvoicingEngine(basic_rules)
+    basic_rules.clear()
+
+    output = engine.process(
+        1, datetime(2022, 1, 15), [InvoicedItem("test", Decimal(2), Decimal(5))]
+    )
+
+    assert output["header"]["currency"]["main"] == "XYZ"
+    assert output["items"][0]["taxes"] == [{"name": "vat", "value": Decimal("2")}]
@@ -0,0 +1,87 @@
+import re
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from invoice_utils.engine import (
+    InvalidItemOperationError, InvoicingEngine, item_operations, register_item_operation
+)
+from invoice_utils.engine._operations import _ITEM_OPERATIONS
+from invoice_utils.models import InvoicedItem
+
+
+def _item_op(name: str, operation: str, value: str, **extra) -> dict:
+    return {"type": "item_op", "name": name, "operation": operation, "value": value, **extra}
+
+
+def _taxes(rules: list[dict], items: list[InvoicedItem]) -> list[list]:
+    output = InvoicingEngine(rules).process(1, datetime(2024, 3, 4), items)
+    return [[(tax["name"], tax["value"]) for tax in item["taxes"]] for item in output["items"]]
+
+
+def test_builtin_item_operations():
+    rules = [
+        _item_op("vat", "%", "19"),
+        _item_op("handling", "fixed", "2.50"),
+        _item_op("eco", "per-unit", "0.15"),
+        _item_op("luxury", "capped", "0.1", cap="30"),
+        _item_op("stamp", "compound", "0.01"),
+    ]
+
+    taxes = _taxes(rules, [
+        InvoicedItem("cheap", Decimal(4), Decimal("12.5")),
+        InvoicedItem("expensive", Decimal(2), Decimal(500)),
+    ])
+
+    assert taxes == [
+        [
+            ("vat", Decimal("9.5")), ("handling", Decimal("2.5")), ("eco", Decimal("0.6")),
+            ("luxury", Decimal("5")), ("stamp", Decimal("0.676")),
+        ],
+        [
+            ("vat", Decimal("190")), ("handling", Decimal("2.5")), ("eco", Decimal("0.3")),
+            ("luxury", Decimal("30")), ("stamp", Decimal("12.228")),
+        ],
+    ]
+
+
+def test_item_total_includes_all_operations():
+    rules = [_item_op("vat", "%", "19"), _item_op("stamp", "compound", "0.01")]
+
+    output = InvoicingEngine(rules).process(1, datetime(2024, 3, 4), [InvoicedItem("x", Decimal(1), Decimal(100))])
+
+    assert output["items"][0]["item_total"] == Decimal("120.19")
+    assert output["totals"]["taxes"] == [
+        {"name": "vat", "value": Decimal("19")}, {"name": "stamp", "value": Decimal("1.19")}
+    ]
+
+
+def test_register_custom_item_operation():
+    @register_item_operation("min-fee", ("value", "min"))
+    def _min_fee(rule):
+        rate, floor = Decimal(rule["value"]), Decimal(rule["min"])
+        return lambda price, quantity=None, taxes=(): max(round(rate * price, 6), floor)
+
+    try:
+        assert "min-fee" in item_operations()
+        taxes = _taxes([_item_op("fee", "min-fee", "0.01", min="1")], [
+            InvoicedItem("a", Decimal(1), Decimal(10)),
+            InvoicedItem("b", Decimal(1), Decimal(1000)),
+        ])
+    finally:
+        _ITEM_OPERATIONS.pop("min-fee")
+
+    assert taxes == [[("fee", Decimal("1"))], [("fee", Decimal("10"))]]
+
+
+@pytest.mark.parametrize("rule,message", [
+    (_item_op("vat", "^", "19"), "item operation 'vat' has unknown operation '^'"),
+    ({"type": "item_op", "name": "vat", "value": "19"}, "item operation 'vat' has unknown operation None"),
+    (_item_op("luxury", "capped", "0.1"), "item operation 'luxury' is missing 'cap'"),
+    ({"type": "item_op", "operation": "%", "value": "19"}, "item operation '' is missing 'name'"),
+    (_item_op("vat", "%", "nineteen"), "item operation 'vat' has an invalid value"),
+])
+def test_invalid_item_operations_fail_at_compile_time(rule, message):
+    with pytest.raises(InvalidItemOperationError, match=re.escape(message)):
+        InvoicingEngine([rule])
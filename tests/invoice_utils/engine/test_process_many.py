@@ -0,0 +1,34 @@
+from datetime import datetime
+from decimal import Decimal
+
+from invoice_utils.engine import InvoicingEngine
+from invoice_utils.models import InvoicedItem
+
+
+def _invoices(count: int):
+    for invoice_no in range(1, count + 1):
+        yield invoice_no, datetime(2022, 1, 15), [
+            InvoicedItem(f"item {invoice_no}", Decimal(invoice_no), Decimal("2.5"))
+        ]
+
+
+def test_process_many_matches_process(basic_rules):
+    engine = InvoicingEngine(basic_rules)
+
+    actual = list(engine.process_many(_invoices(5)))
+
+    assert actual == [engine.process(*invoice) for invoice in _invoices(5)]
+
+
+def test_process_many_consumes_input_lazily(basic_rules):
+    source = _invoices(3)
+    results = InvoicingEngine(basic_rules).process_many(source)
+
+    first = next(results)
+
+    assert first["header"]["number"] == 1
+    assert next(source)[0] == 2
+
+
+def test_process_many_empty_input(basic_rules):
+    assert list(InvoicingEngine(basic_rules).process_many([])) == []
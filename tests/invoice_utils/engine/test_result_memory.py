@@ -0,0 +1,64 @@
+import tracemalloc
+from collections.abc import Mapping
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from invoice_utils.engine import InvoicingEngine
+from invoice_utils.models import InvoicedItem
+
+
+LINE_COUNT = 50_000
+
+
+def _as_plain_dicts(value):
+    if isinstance(value, Mapping):
+        return {k: _as_plain_dicts(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_as_plain_dicts(v) for v in value]
+    return value
+
+
+def _retained_memory(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, retained
+
+
+@pytest.fixture(scope="module")
+def items():
+    return [
+        InvoicedItem(f"line {i}", Decimal(i % 17 + 1), Decimal(i % 1000) + Decimal("0.99"))
+        for i in range(LINE_COUNT)
+    ]
+
+
+def test_line_results_support_mapping_access(basic_rules):
+    output = InvoicingEngine(basic_rules).process(
+        1, datetime(2022, 1, 15), [InvoicedItem("line", Decimal(2), Decimal("10.99"))]
+    )
+
+    item = output["items"][0]
+    assert item["taxes"][0]["value"] == item.taxes[0].value
+    assert item["extra"]["currencies"][0]["currency"] == "ABC"
+    assert dict(output["totals"]).keys() == {"price", "total", "taxes", "extra"}
+    assert _as_plain_dicts(output) == output
+
+
+@pytest.mark.benchmark
+def test_compact_results_use_less_memory_than_nested_dicts(basic_rules, items):
+    engine = InvoicingEngine(basic_rules)
+    invoice_date = datetime(2022, 1, 15)
+
+    compact, compact_size = _retained_memory(lambda: engine.process(1, invoice_date, items))
+    nested, nested_size = _retained_memory(
+        lambda: _as_plain_dicts(engine.process(1, invoice_date, items))
+    )
+
+    assert compact == nested
+    assert compact_size < nested_size * 0.7
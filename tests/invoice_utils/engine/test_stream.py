@@ -0,0 +1,45 @@
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from invoice_utils.engine import InvoicingEngine
+
+
+INVOICE_DATE = datetime(2022, 1, 15)
+
+
+def test_stream_yields_same_lines_and_totals_as_process(basic_rules, invoiced_items):
+    engine = InvoicingEngine(basic_rules)
+    expected = engine.process(7, INVOICE_DATE, invoiced_items(50))
+
+    stream = engine.stream(7, INVOICE_DATE, iter(invoiced_items(50)))
+    lines = list(stream)
+
+    assert stream.header == expected["header"]
+    assert lines == expected["items"]
+    assert stream.totals == expected["totals"]
+
+
+def test_stream_totals_require_consumed_lines(basic_rules, invoiced_items):
+    stream = InvoicingEngine(basic_rules).stream(1, INVOICE_DATE, iter(invoiced_items(3)))
+    next(iter(stream))
+
+    with pytest.raises(RuntimeError):
+        _ = stream.totals
+
+
+def test_stream_does_not_retain_line_items(basic_rules, invoiced_items):
+    stream = InvoicingEngine(basic_rules).stream(1, INVOICE_DATE, iter(invoiced_items(20_000)))
+
+    tracemalloc.start()
+    try:
+        line_count = sum(1 for _ in stream)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert line_count == 20_000
+    assert stream.totals["price"] == Decimal("39763229.99")
+    assert peak < 256 * 1024
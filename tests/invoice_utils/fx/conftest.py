@@ -0,0 +1,100 @@
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+import pytest
+
+from invoice_utils import config
+
+
+class BnrStandIn:
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.etags: dict[str, str] = {}
+        self.requests: list[tuple[str, dict]] = []
+        self.clients: set[int] = set()
+        self.failures = 0
+        self.delay = 0.0
+        self.lock = Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}/files/xml/years"
+
+    def publish(self, year: int, content: bytes, etag: str = None):
+        name = f"nbrfxrates{year}.xml"
+        self.files[name] = content
+        self.etags[name] = etag or f'"{year}-{len(content)}"'
+
+    def requests_for(self, year: int) -> list[dict]:
+        with self.lock:
+            return [headers for path, headers in self.requests if path.endswith(f"nbrfxrates{year}.xml")]
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with stand_in.lock:
+                    stand_in.requests.append((self.path, dict(self.headers)))
+                    stand_in.clients.add(self.client_address[1])
+                    failing = stand_in.failures > 0
+                    stand_in.failures -= failing
+                if stand_in.delay:
+                    time.sleep(stand_in.delay)
+                name = self.path.rsplit("/", 1)[-1]
+                if failing or name not in stand_in.files:
+                    self._empty(HTTPStatus.SERVICE_UNAVAILABLE if failing else HTTPStatus.NOT_FOUND)
+                    return
+                etag = stand_in.etags[name]
+                if self.headers.get("If-None-Match") == etag:
+                    self._empty(HTTPStatus.NOT_MODIFIED, etag)
+                    return
+                body = stand_in.files[name]
+                self.send_response(HTTPStatus.OK)
+                self.send_header("Content-Type", "text/xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _empty(self, status: HTTPStatus, etag: str = None):
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture(autouse=True)
+def fx_http_settings(monkeypatch):
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_HTTP_BACKOFF", 0.0)
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_HTTP_READ_TIMEOUT", 2.0)
+
+
+@pytest.fixture
+def bnr_server(responses):
+    stand_in = BnrStandIn()
+    responses.add_passthru(stand_in.url)
+    thread = Thread(target=stand_in.server.serve_forever, daemon=True)
+    thread.start()
+    yield stand_in
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
+
+
+@pytest.fixture
+def bnr_xml(read_text):
+    return read_text("bnr-response-1-item.xml").encode()
+
+
+@pytest.fixture
+def bnr_url(bnr_server, monkeypatch):
+    monkeypatch.setattr(config, "INVOICE_UTILS_BNR_URL", bnr_server.url)
+    return bnr_server.url
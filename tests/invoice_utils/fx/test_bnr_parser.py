@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from invoice_utils import config
+from invoice_utils.fx import BnrRates, iter_bnr_rates
+
+
+def _year_xml(days: int) -> bytes:
+    cubes = "".join(
+        f'<Cube date="{date(2011, 1, 3) + timedelta(days=day)}">'
+        f'<Rate currency="EUR">4.{day:04}</Rate><Rate currency="USD">3.{day:04}</Rate></Cube>'
+        for day in range(days)
+    )
+    xml = f'<DataSet xmlns="http://www.bnr.ro/xsd"><Body>{cubes}</Body></DataSet>'
+    return xml.encode()
+
+
+def test_iter_bnr_rates_yields_every_published_day():
+    rates = list(iter_bnr_rates(BytesIO(_year_xml(250))))
+
+    assert len(rates) == 250
+    assert rates[0] == ("2011-01-03", {"EUR": Decimal("4.0000"), "USD": Decimal("3.0000")})
+    assert rates[-1][1]["EUR"] == Decimal("4.0249")
+
+
+def test_index_streams_response_without_disk_cache(bnr_url, bnr_server, monkeypatch, fx_cache_dir):
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_CACHE_DIR", "")
+    bnr_server.publish(2011, _year_xml(250))
+
+    index = BnrRates().index(2011)
+
+    assert len(index) == 250
+    assert index.rates_on("2011-03-01")["USD"] == Decimal("3.0057")
+    assert not fx_cache_dir.exists()
@@ -0,0 +1,93 @@
+from datetime import datetime
+from decimal import Decimal
+
+from invoice_utils.engine import InvoicingEngine
+from invoice_utils.fx import FxFileCache
+from invoice_utils.models import InvoicedItem
+
+def _read(cache: FxFileCache, url: str, year: int) -> bytes:
+    with cache.open_yearly_file(url, year) as f:
+        return f.read()
+
+
+def _cache(fx_cache_dir, clock, now: datetime, ttl: float = 60) -> FxFileCache:
+    clock.now = now.timestamp()
+    return FxFileCache(fx_cache_dir, ttl, clock)
+
+
+def test_current_year_is_served_from_disk_within_ttl(fx_cache_dir, bnr_server, bnr_xml, clock):
+    bnr_server.publish(2024, bnr_xml)
+    cache = _cache(fx_cache_dir, clock, datetime(2024, 6, 1))
+    url = f"{bnr_server.url}/nbrfxrates2024.xml"
+
+    assert _read(cache, url, 2024) == bnr_xml
+    clock.now += 30
+    assert _read(cache, url, 2024) == bnr_xml
+
+    assert len(bnr_server.requests_for(2024)) == 1
+    assert (fx_cache_dir / "nbrfxrates2024.xml").read_bytes() == bnr_xml
+
+
+def test_current_year_is_revalidated_after_ttl(fx_cache_dir, bnr_server, bnr_xml, clock):
+    bnr_server.publish(2024, bnr_xml, etag='"v1"')
+    cache = _cache(fx_cache_dir, clock, datetime(2024, 6, 1))
+    url = f"{bnr_server.url}/nbrfxrates2024.xml"
+    _read(cache, url, 2024)
+
+    clock.now += 120
+    assert _read(cache, url, 2024) == bnr_xml
+    bnr_server.publish(2024, bnr_xml + b"\n", etag='"v2"')
+    clock.now += 120
+    assert _read(cache, url, 2024) == bnr_xml + b"\n"
+
+    requests = bnr_server.requests_for(2024)
+    assert [r.get("If-None-Match") for r in requests] == [None, '"v1"', '"v1"']
+
+
+def test_past_year_fetched_after_year_end_is_immutable(fx_cache_dir, bnr_server, bnr_xml, clock):
+    bnr_server.publish(2011, bnr_xml)
+    cache = _cache(fx_cache_dir, clock, datetime(2024, 6, 1))
+    url = f"{bnr_server.url}/nbrfxrates2011.xml"
+    _read(cache, url, 2011)
+
+    clock.now += 10 * 365 * 86400
+    _read(cache, url, 2011)
+
+    assert len(bnr_server.requests_for(2011)) == 1
+
+
+def test_past_year_fetched_during_that_year_is_revalidated(fx_cache_dir, bnr_server, bnr_xml, clock):
+    bnr_server.publish(2023, bnr_xml)
+    cache = _cache(fx_cache_dir, clock, datetime(2023, 12, 20))
+    url = f"{bnr_server.url}/nbrfxrates2023.xml"
+    _read(cache, url, 2023)
+
+    clock.now = datetime(2024, 1, 5).timestamp()
+    _read(cache, url, 2023)
+    _read(cache, url, 2023)
+
+    assert len(bnr_server.requests_for(2023)) == 2
+
+
+def test_stale_file_is_served_when_bnr_is_unreachable(fx_cache_dir, bnr_server, bnr_xml, clock):
+    bnr_server.publish(2024, bnr_xml)
+    cache = _cache(fx_cache_dir, clock, datetime(2024, 6, 1))
+    url = f"{bnr_server.url}/nbrfxrates2024.xml"
+    _read(cache, url, 2024)
+    bnr_server.server.shutdown()
+    bnr_server.server.server_close()
+
+    clock.now += 120
+    assert _read(cache, url, 2024) == bnr_xml
+
+
+def test_engine_reads_bnr_rates_through_disk_cache(bnr_url, bnr_server, bnr_xml):
+    bnr_server.publish(2011, bnr_xml)
+    rules = [{"type": "bnr-fx-rate", "symbol": "EUR"}]
+    item = InvoicedItem("item", Decimal(1), Decimal(10))
+
+    for _ in range(3):
+        result = InvoicingEngine(rules).process(1, datetime(2011, 11, 11), [item])
+
+    assert result["header"]["currency"]["exchangeRates"] == {"RON": Decimal("4.9273")}
+    assert len(bnr_server.requests_for(2011)) == 1
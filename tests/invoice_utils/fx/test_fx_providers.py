@@ -0,0 +1,197 @@
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from invoice_utils.engine import InvoicingEngine
+from invoice_utils.fx import (
+    BnrFxRateProvider, CompositeFxRateProvider, FileFxRateProvider, FxRateProvider, InvalidFxProviderError,
+    StaticFxRateProvider, fx_provider
+)
+from invoice_utils.models import InvoicedItem
+
+DAY = date(2011, 11, 11)
+
+
+class FailingProvider(FxRateProvider):
+    name = "failing"
+
+    def rates_for(self, dates, currencies):
+        raise ConnectionError("offline")
+
+
+@pytest.fixture
+def rates_csv(tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text("date,currency,rate\n2011-11-10,EUR,4.3000\n2011-11-11,EUR,4.3100\n2011-11-11,USD,3.1000\n")
+    return path
+
+
+@pytest.fixture
+def rates_json(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text(json.dumps({"rates": {"2011-11-11": {"EUR": "4.3200"}, "2011-11-14": {"EUR": "4.3300"}}}))
+    return path
+
+
+def test_bnr_provider_fetches_date_range_once(bnr_url, bnr_server, bnr_xml):
+    bnr_server.publish(2011, bnr_xml)
+
+    rates = BnrFxRateProvider().rates_for([date(2011, 11, day) for day in range(1, 31)], ["EUR", "USD"])
+
+    assert rates == {
+        date(2011, 11, day): {"EUR": Decimal("4.9273"), "USD": Decimal("4.6766")} for day in range(11, 19)
+    }
+    assert len(bnr_server.requests_for(2011)) == 1
+
+
+def test_bnr_provider_falls_back_to_previous_year_before_new_year_is_published(bnr_url, bnr_server, bnr_xml):
+    bnr_server.publish(2011, bnr_xml)
+
+    provider = BnrFxRateProvider(lookback_days=60)
+
+    rates = provider.rates_for([date(2012, 1, 1), date(2012, 1, 2)], ["EUR"])
+    provider.rates_for([date(2012, 1, 2)], ["EUR"])
+
+    assert rates == {date(2012, 1, day): {"EUR": Decimal("4.9273")} for day in (1, 2)}
+    assert len(bnr_server.requests_for(2012)) == 1
+    assert len(bnr_server.requests_for(2011)) == 1
+
+
+@pytest.mark.parametrize("fixture", ["rates_csv", "rates_json"])
+def test_file_provider(request, fixture):
+    provider = FileFxRateProvider(request.getfixturevalue(fixture))
+
+    rates = provider.rates_for([date(2011, 11, 9), DAY, date(2011, 11, 12), date(2011, 11, 22)], ["EUR"])
+
+    assert rates[DAY]["EUR"] in (Decimal("4.31"), Decimal("4.32"))
+    assert rates[date(2011, 11, 12)] == rates[DAY]
+    assert date(2011, 11, 9) not in rates
+    assert date(2011, 11, 22) not in rates
+
+
+def test_file_provider_reloads_changed_file(rates_json):
+    provider = FileFxRateProvider(rates_json)
+    assert provider.rates_for([DAY], ["EUR"]) == {DAY: {"EUR": Decimal("4.32")}}
+
+    rates_json.write_text(json.dumps({"rates": {"2011-11-11": {"EUR": "4.40"}}}))
+    stat = rates_json.stat()
+    os.utime(rates_json, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert provider.rates_for([DAY], ["EUR"]) == {DAY: {"EUR": Decimal("4.40")}}
+
+
+def test_static_provider_applies_to_every_date():
+    provider = StaticFxRateProvider({"EUR": "4.95", "USD": 4.5}, "RON")
+
+    assert provider.rates_for([DAY, date(2030, 1, 1)], ["EUR"]) == {
+        DAY: {"EUR": Decimal("4.95")}, date(2030, 1, 1): {"EUR": Decimal("4.95")}
+    }
+
+
+def test_composite_asks_next_provider_only_for_missing_rates(rates_csv):
+    calls = []
+
+    class Recording(StaticFxRateProvider):
+        def rates_for(self, dates, currencies):
+            dates = list(dates)
+            calls.append(dates)
+            return super().rates_for(dates, currencies)
+
+    provider = CompositeFxRateProvider([FileFxRateProvider(rates_csv), Recording({"EUR": "5"})])
+
+    rates = provider.rates_for([date(2011, 11, 9), DAY, date(2011, 11, 12)], ["EUR"])
+
+    assert rates == {
+        date(2011, 11, 9): {"EUR": Decimal("5")},
+        DAY: {"EUR": Decimal("4.31")},
+        date(2011, 11, 12): {"EUR": Decimal("4.31")},
+    }
+    assert calls == [[date(2011, 11, 9)]]
+    assert provider.name == "file/static"
+
+
+def test_composite_falls_back_when_a_provider_fails(caplog):
+    provider = CompositeFxRateProvider([FailingProvider(), StaticFxRateProvider({"EUR": "5"})])
+
+    assert provider.rates_for([DAY], ["EUR"]) == {DAY: {"EUR": Decimal("5")}}
+    assert caplog.messages == ["FX rate provider failing failed, trying the next one"]
+
+
+def test_composite_raises_when_nothing_was_found():
+    with pytest.raises(ConnectionError):
+        CompositeFxRateProvider([FailingProvider()]).rates_for([DAY], ["EUR"])
+
+
+def test_composite_requires_single_base_currency():
+    with pytest.raises(ValueError):
+        CompositeFxRateProvider([StaticFxRateProvider({}, "RON"), StaticFxRateProvider({}, "EUR")])
+
+
+def test_fx_provider_from_template_specs(rates_csv):
+    assert isinstance(fx_provider([{"type": "bnr"}]), BnrFxRateProvider)
+    assert isinstance(fx_provider([{"type": "file", "path": str(rates_csv)}, {"type": "bnr"}]), CompositeFxRateProvider)
+    with pytest.raises(InvalidFxProviderError):
+        fx_provider([{"type": "ecb"}])
+    with pytest.raises(InvalidFxProviderError):
+        fx_provider([{"type": "file"}])
+
+
+def test_engine_fx_rate_rule_uses_template_providers(rates_csv):
+    rules = [{
+        "type": "fx-rate",
+        "symbol": "EUR",
+        "providers": [{"type": "file", "path": str(rates_csv)}, {"type": "static", "rates": {"EUR": "4.99"}}],
+    }]
+    engine = InvoicingEngine(rules)
+    item = InvoicedItem("item", Decimal(1), Decimal(10))
+
+    from_file = engine.process(1, datetime(2011, 11, 11), [item])
+    from_static = engine.process(2, datetime(2011, 11, 19), [item])
+
+    assert from_file["header"]["currency"] == {"main": "EUR", "exchangeRates": {"RON": Decimal("4.31")}}
+    assert from_static["header"]["currency"]["exchangeRates"] == {"RON": Decimal("4.99")}
+
+
+def _bnr_year(days: list[str]) -> bytes:
+    cubes = "".join(f'<Cube date="{day}"><Rate currency="EUR">{day[5:7]}.{day[8:]}</Rate></Cube>' for day in days)
+    return f'<DataSet xmlns="http://www.bnr.ro/xsd"><Body>{cubes}</Body></DataSet>'.encode()
+
+
+def test_bnr_provider_uses_latest_rates_before_bank_holiday(bnr_url, bnr_server):
+    bnr_server.publish(2023, _bnr_year(["2023-12-21", "2023-12-22", "2023-12-27"]))
+
+    rates = BnrFxRateProvider().rates_for([date(2023, 12, day) for day in (23, 25, 26, 27)], ["EUR"])
+
+    assert rates == {
+        date(2023, 12, 23): {"EUR": Decimal("12.22")},
+        date(2023, 12, 25): {"EUR": Decimal("12.22")},
+        date(2023, 12, 26): {"EUR": Decimal("12.22")},
+        date(2023, 12, 27): {"EUR": Decimal("12.27")},
+    }
+
+
+def test_bnr_provider_resolves_across_year_boundary(bnr_url, bnr_server):
+    bnr_server.publish(2023, _bnr_year(["2023-12-28", "2023-12-29"]))
+    bnr_server.publish(2024, _bnr_year(["2024-01-03"]))
+
+    rates = BnrFxRateProvider().rates_for([date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)], ["EUR"])
+
+    assert rates == {
+        date(2024, 1, 1): {"EUR": Decimal("12.29")},
+        date(2024, 1, 2): {"EUR": Decimal("12.29")},
+        date(2024, 1, 3): {"EUR": Decimal("1.03")},
+    }
+    assert len(bnr_server.requests_for(2023)) == 1
+    assert len(bnr_server.requests_for(2024)) == 1
+
+
+def test_bnr_provider_lookback_is_bounded(bnr_url, bnr_server):
+    bnr_server.publish(2024, _bnr_year(["2024-03-01"]))
+
+    rates = BnrFxRateProvider(lookback_days=3).rates_for([date(2024, 3, 4), date(2024, 3, 5)], ["EUR"])
+
+    assert rates == {date(2024, 3, 4): {"EUR": Decimal("3.01")}}
+    assert bnr_server.requests_for(2023) == []
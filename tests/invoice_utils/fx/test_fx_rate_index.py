@@ -0,0 +1,78 @@
+from datetime import datetime
+from io import BytesIO
+from decimal import Decimal
+
+import pytest
+
+from invoice_utils.engine import InvoicingEngine
+from invoice_utils.fx import BnrRates, FxRateIndex, default_cache
+from invoice_utils.models import InvoicedItem
+
+
+def test_index_from_bnr_xml(bnr_xml):
+    index = FxRateIndex.from_bnr_xml(BytesIO(bnr_xml))
+
+    assert len(index) == 1
+    assert index.rates_on("2011-11-11")["EUR"] == Decimal("4.9273")
+    assert index.rates_on("2011-11-11")["USD"] == Decimal("4.6766")
+    assert index.rates_on("2011-11-10") is None
+
+
+def test_index_is_shared_by_engines_and_invoices(bnr_url, bnr_server, bnr_xml):
+    bnr_server.publish(2011, bnr_xml)
+    item = InvoicedItem("item", Decimal(1), Decimal(10))
+    eur = InvoicingEngine([{"type": "bnr-fx-rate", "symbol": "EUR"}])
+    usd = InvoicingEngine([{"type": "bnr-fx-rate", "symbol": "USD"}])
+
+    results = [engine.process(1, datetime(2011, 11, 11), [item]) for engine in (eur, usd, eur, usd)]
+
+    assert [r["header"]["currency"]["exchangeRates"] for r in results] == [
+        {"RON": Decimal("4.9273")}, {"RON": Decimal("4.6766")}
+    ] * 2
+    assert len(bnr_server.requests_for(2011)) == 1
+
+
+def test_index_of_open_year_is_rebuilt_after_ttl(bnr_url, bnr_server, bnr_xml):
+    bnr_server.publish(2011, bnr_xml)
+    now = [datetime(2011, 11, 20).timestamp()]
+    rates = BnrRates(default_cache, lambda: now[0])
+
+    first = rates.index(2011)
+    assert rates.index(2011) is first
+    now[0] += 7200
+
+    assert rates.index(2011) is not first
+
+
+def test_index_of_closed_year_is_kept(bnr_url, bnr_server, bnr_xml):
+    bnr_server.publish(2011, bnr_xml)
+    now = [datetime(2013, 1, 1).timestamp()]
+    rates = BnrRates(default_cache, lambda: now[0])
+
+    first = rates.index(2011)
+    now[0] += 365 * 86400
+
+    assert rates.index(2011) is first
+
+
+def test_unpublished_year_is_cached_as_empty_until_ttl(bnr_url, bnr_server):
+    now = [datetime(2012, 1, 2).timestamp()]
+    rates = BnrRates(default_cache, lambda: now[0])
+
+    assert len(rates.index(2012)) == 0
+    assert len(rates.index(2012)) == 0
+    assert len(bnr_server.requests_for(2012)) == 1
+    now[0] += 7200
+
+    rates.index(2012)
+    assert len(bnr_server.requests_for(2012)) == 2
+
+
+@pytest.mark.parametrize("body", [b"<DataSet", b'<DataSet xmlns="http://www.bnr.ro/xsd"><Cube/></DataSet>'])
+def test_unusable_file_is_evicted_from_disk_cache(bnr_url, bnr_server, fx_cache_dir, body):
+    bnr_server.publish(2011, body)
+
+    with pytest.raises(Exception):
+        BnrRates().index(2011)
+
+    assert not (fx_cache_dir / "nbrfxrates2011.xml").exists()
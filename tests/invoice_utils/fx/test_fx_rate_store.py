@@ -0,0 +1,71 @@
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+from invoice_utils import config
+from invoice_utils.fx import BnrRates, FxRateIndex, FxRateStore, default_cache, default_store
+
+
+def _rates(now: datetime) -> BnrRates:
+    return BnrRates(default_cache, lambda: now.timestamp())
+
+
+def test_store_round_trip(tmp_path):
+    store = FxRateStore(tmp_path / "rates.sqlite3")
+    store.put("BNR", 2011, FxRateIndex({
+        "2011-11-10": {"EUR": Decimal("4.3000")},
+        "2011-11-11": {"EUR": Decimal("4.3100"), "USD": Decimal("3.1")},
+    }), final=True)
+    store.put("BNR", 2012, FxRateIndex({"2012-01-03": {"EUR": Decimal("4.35")}}), final=False)
+
+    index = FxRateStore(tmp_path / "rates.sqlite3").index("BNR", 2011)
+
+    assert dict(index.items()) == {
+        "2011-11-10": {"EUR": Decimal("4.3000")},
+        "2011-11-11": {"EUR": Decimal("4.3100"), "USD": Decimal("3.1")},
+    }
+    assert str(index.rates_on("2011-11-10")["EUR"]) == "4.3000"
+    assert store.index("BNR", 2012, final_only=True) is None
+    assert store.index("ECB", 2011) is None
+    assert store.index("BNR", 2011, final_only=True) is not None
+
+
+def test_closed_years_are_loaded_from_store_without_network(bnr_url, bnr_server, bnr_xml, fx_cache_dir):
+    bnr_server.publish(2011, bnr_xml)
+    _rates(datetime(2013, 5, 1)).index(2011)
+    (fx_cache_dir / "nbrfxrates2011.xml").unlink()
+
+    index = _rates(datetime(2013, 5, 2)).index(2011)
+
+    assert index.rates_on("2011-11-11")["EUR"] == Decimal("4.9273")
+    assert len(bnr_server.requests_for(2011)) == 1
+    assert default_store().index("BNR", 2011, final_only=True) is not None
+
+
+def test_open_year_is_imported_incrementally(bnr_url, bnr_server):
+    day = '<Cube date="{}"><Rate currency="EUR">{}</Rate></Cube>'
+    xml = '<DataSet xmlns="http://www.bnr.ro/xsd"><Body>{}</Body></DataSet>'
+    bnr_server.publish(2024, xml.format(day.format("2024-03-01", "4.97")).encode(), etag='"1"')
+    _rates(datetime(2024, 3, 1, 15)).index(2024)
+    bnr_server.publish(2024, xml.format(
+        day.format("2024-03-01", "4.97") + day.format("2024-03-04", "4.98")
+    ).encode(), etag='"2"')
+
+    _rates(datetime(2024, 3, 4, 15)).refresh(2024)
+
+    assert default_store().index("BNR", 2024, final_only=True) is None
+    assert len(default_store().index("BNR", 2024)) == 2
+
+
+def test_stored_rates_are_served_when_offline(bnr_url, bnr_server, bnr_xml, monkeypatch, caplog):
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_HTTP_RETRIES", 0)
+    bnr_server.publish(2011, bnr_xml)
+    _rates(datetime(2011, 11, 20)).index(2011)
+    default_cache().invalidate(BnrRates.url(2011))
+    bnr_server.failures = 5
+
+    with caplog.at_level(logging.WARNING):
+        index = _rates(datetime(2011, 11, 21)).index(2011)
+
+    assert index.rates_on("2011-11-11")["EUR"] == Decimal("4.9273")
+    assert caplog.messages[-1].startswith("serving stored FX rates for 2011")
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import arrow
+import pytest
+
+from invoice_utils import config
+from invoice_utils.fx import BnrRates, FxRateRefresher, default_cache
+
+
+def _rates(now: list[float]) -> BnrRates:
+    return BnrRates(default_cache, lambda: now[0])
+
+
+@pytest.mark.parametrize("now, expected", [
+    ("2024-03-04T09:00:00+02:00", 4 * 3600 + 15 * 60),
+    ("2024-03-04T13:15:00+02:00", 24 * 3600),
+    ("2024-03-04T20:00:00+02:00", 17 * 3600 + 15 * 60),
+])
+def test_seconds_until_next_refresh(now, expected):
+    refresher = FxRateRefresher(BnrRates(), "13:15", "Europe/Bucharest")
+
+    assert refresher.seconds_until_next_refresh(arrow.get(now).to("Europe/Bucharest")) == expected
+
+
+def test_start_prefetches_current_and_previous_year(bnr_url, bnr_server, bnr_xml):
+    current_year = arrow.now("Europe/Bucharest").year
+    for year in (current_year, current_year - 1):
+        bnr_server.publish(year, bnr_xml)
+    rates = BnrRates()
+    refresher = FxRateRefresher(rates, "13:15", "Europe/Bucharest")
+
+    async def run():
+        refresher.start()
+        await asyncio.sleep(0.5)
+        await refresher.stop()
+
+    asyncio.run(run())
+
+    assert len(bnr_server.requests_for(current_year)) == 1
+    assert len(bnr_server.requests_for(current_year - 1)) == 1
+    served = len(bnr_server.requests)
+    rates.index(current_year)
+    rates.index(current_year - 1)
+    assert len(bnr_server.requests) == served
+
+
+def test_request_path_serves_expired_index_while_refresher_runs(bnr_url, bnr_server, bnr_xml):
+    bnr_server.publish(2011, bnr_xml)
+    now = [datetime(2011, 11, 20).timestamp()]
+    rates = _rates(now)
+    first = rates.index(2011)
+    now[0] += 2 * config.INVOICE_UTILS_FX_CACHE_TTL
+
+    rates.serve_stale = True
+    assert rates.index(2011) is first
+    rates.serve_stale = False
+    assert rates.index(2011) is not first
+
+
+def test_failed_refresh_keeps_stale_rates_and_warns(bnr_url, bnr_server, bnr_xml, monkeypatch, caplog):
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_CACHE_DIR", "")
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_HTTP_RETRIES", 0)
+    current_year = arrow.now("Europe/Bucharest").year
+    bnr_server.publish(current_year, bnr_xml)
+    bnr_server.publish(current_year - 1, bnr_xml)
+    rates = BnrRates()
+    refresher = FxRateRefresher(rates, "13:15", "Europe/Bucharest")
+    asyncio.run(refresher.refresh())
+    warm = rates.index(current_year)
+
+    bnr_server.failures = 10
+    with caplog.at_level(logging.WARNING):
+        asyncio.run(refresher.refresh())
+
+    assert rates.index(current_year) is warm
+    assert f"FX rate refresh for {current_year} failed, serving stale rates" in caplog.messages
@@ -0,0 +1,58 @@
+import pytest
+import requests
+
+from invoice_utils import config
+from invoice_utils.fx import BnrRates, fx_session
+
+
+def test_session_is_shared_and_rebuilt_on_config_change(monkeypatch):
+    session = fx_session()
+    assert fx_session() is session
+
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_HTTP_POOL_SIZE", 2)
+
+    assert fx_session() is not session
+    assert fx_session().get_adapter("https://bnr.ro")._pool_maxsize == 2
+
+
+def test_downloads_reuse_pooled_connection(bnr_url, bnr_server, bnr_xml, monkeypatch):
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_CACHE_DIR", "")
+    for year in (2009, 2010, 2011):
+        bnr_server.publish(year, bnr_xml)
+
+    for year in (2009, 2010, 2011):
+        BnrRates().index(year)
+
+    assert len(bnr_server.requests) == 3
+    assert len(bnr_server.clients) == 1
+
+
+def test_transient_errors_are_retried(bnr_url, bnr_server, bnr_xml):
+    bnr_server.publish(2011, bnr_xml)
+    bnr_server.failures = 2
+
+    index = BnrRates().index(2011)
+
+    assert len(index) == 1
+    assert len(bnr_server.requests_for(2011)) == 3
+
+
+def test_persistent_errors_fail_after_retries(bnr_url, bnr_server, bnr_xml, monkeypatch):
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_HTTP_RETRIES", 1)
+    bnr_server.publish(2011, bnr_xml)
+    bnr_server.failures = 5
+
+    with pytest.raises(requests.HTTPError):
+        BnrRates().index(2011)
+
+    assert len(bnr_server.requests_for(2011)) == 2
+
+
+def test_slow_response_times_out(bnr_url, bnr_server, bnr_xml, monkeypatch):
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_HTTP_READ_TIMEOUT", 0.2)
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_HTTP_RETRIES", 0)
+    bnr_server.publish(2011, bnr_xml)
+    bnr_server.delay = 1.0
+
+    with pytest.raises(requests.RequestException):
+        BnrRates().index(2011)
@@ -0,0 +1,162 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from threading import Barrier, Event, get_ident
+
+import pytest
+
+from invoice_utils import config
+from invoice_utils.engine import InvoicingEngine
+from invoice_utils.fx import BnrRates, SingleFlight
+from invoice_utils.models import InvoicedItem
+
+CALLERS = 50
+
+
+def test_single_flight_shares_result_and_error():
+    flight = SingleFlight()
+    started, release, calls = Event(), Event(), []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return object()
+
+    with ThreadPoolExecutor(8) as executor:
+        leader = executor.submit(flight.do, "key", slow)
+        started.wait()
+        followers = [executor.submit(flight.do, "key", slow) for _ in range(7)]
+        release.set()
+        results = {id(future.result()) for future in [leader, *followers]}
+
+    assert len(calls) == 1
+    assert len(results) == 1
+
+    def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", failing)
+    assert flight.do("key", lambda: 42) == 42
+
+
+def test_async_and_sync_callers_share_one_flight():
+    flight = SingleFlight()
+    started, release, calls, threads = Event(), Event(), [], set()
+
+    def slow():
+        calls.append(1)
+        threads.add(get_ident())
+        started.set()
+        release.wait()
+        return object()
+
+    async def run():
+        leader = asyncio.create_task(flight.do_async("key", slow))
+        await asyncio.to_thread(started.wait)
+        followers = [asyncio.create_task(flight.do_async("key", slow)) for _ in range(CALLERS)]
+        with ThreadPoolExecutor(1) as executor:
+            sync_follower = executor.submit(flight.do, "key", slow)
+            await asyncio.sleep(0.01)
+            release.set()
+            results = await asyncio.gather(leader, *followers)
+            return results, sync_follower.result()
+
+    results, sync_result = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert len(threads) == 1
+    assert {id(result) for result in results} == {id(sync_result)}
+
+
+def test_async_waiters_receive_leader_error():
+    flight = SingleFlight()
+    release = Event()
+
+    def failing():
+        release.wait()
+        raise ValueError("boom")
+
+    async def run():
+        tasks = [asyncio.create_task(flight.do_async("key", failing)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+
+def test_cancelled_async_leader_still_settles_waiters():
+    flight = SingleFlight()
+    started, release, calls = Event(), Event(), []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "rates"
+
+    async def run():
+        leader = asyncio.create_task(flight.do_async("key", slow))
+        await asyncio.to_thread(started.wait)
+        with ThreadPoolExecutor(1) as executor:
+            sync_waiter = executor.submit(flight.do, "key", slow)
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            await asyncio.gather(leader, return_exceptions=True)
+            async_waiter = asyncio.create_task(flight.do_async("key", slow))
+            await asyncio.sleep(0.01)
+            release.set()
+            return leader.cancelled(), sync_waiter.result(), await async_waiter
+
+    assert asyncio.run(run()) == (True, "rates", "rates")
+    assert len(calls) == 1
+
+
+@pytest.fixture
+def slow_bnr(bnr_url, bnr_server, bnr_xml, monkeypatch):
+    monkeypatch.setattr(config, "INVOICE_UTILS_FX_CACHE_DIR", "")
+    bnr_server.publish(2011, bnr_xml)
+    bnr_server.delay = 0.3
+    return bnr_server
+
+
+def test_concurrent_threads_download_once(slow_bnr):
+    rates, barrier = BnrRates(), Barrier(CALLERS)
+
+    def lookup():
+        barrier.wait()
+        return rates.index(2011)
+
+    with ThreadPoolExecutor(CALLERS) as executor:
+        indexes = list(executor.map(lambda _: lookup(), range(CALLERS)))
+
+    assert len({id(index) for index in indexes}) == 1
+    assert len(slow_bnr.requests_for(2011)) == 1
+
+
+def test_concurrent_refresh_tasks_download_once(slow_bnr):
+    rates = BnrRates()
+
+    async def lookup_all():
+        return await asyncio.gather(*(rates.refresh_async(2011) for _ in range(CALLERS)))
+
+    indexes = asyncio.run(lookup_all())
+
+    assert len({id(index) for index in indexes}) == 1
+    assert len(slow_bnr.requests_for(2011)) == 1
+
+
+def test_concurrent_invoices_download_once(slow_bnr):
+    engine = InvoicingEngine([{"type": "bnr-fx-rate", "symbol": "EUR"}])
+    item = InvoicedItem("item", Decimal(1), Decimal(10))
+
+    with ThreadPoolExecutor(CALLERS) as executor:
+        results = list(executor.map(
+            lambda no: engine.process(no, datetime(2011, 11, 11), [item]), range(CALLERS)
+        ))
+
+    assert {r["header"]["currency"]["exchangeRates"]["RON"] for r in results} == {Decimal("4.9273")}
+    assert len(slow_bnr.requests_for(2011)) == 1
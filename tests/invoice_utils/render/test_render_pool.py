@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from invoice_utils.engine import InvoicingEngine
+from invoice_utils.models import InvoicedItem
+from invoice_utils.render import PdfRenderPool, RenderQueueFullError
+
+
+@pytest.fixture
+def context():
+    return InvoicingEngine([{"type": "currency", "main": {"symbol": "EUR"}}]).process(
+        1, datetime(2024, 3, 4), [InvoicedItem("item", Decimal(2), Decimal("12.5"))]
+    )
+
+
+@pytest.fixture
+def pool():
+    result = PdfRenderPool(workers=1, max_pending=4)
+    yield result
+    asyncio.run(result.stop())
+
+
+def test_inline_pool_renders_on_a_thread(mocker, context):
+    render = mocker.patch("invoice_utils.render._render.PdfInvoiceRenderer.render", return_value=b"pdf")
+
+    content = asyncio.run(PdfRenderPool(workers=0, max_pending=1).render("invoice", context, "out.pdf"))
+
+    assert content == b"pdf"
+    render.assert_called_once_with(context, "out.pdf", False)
+
+
+def test_pool_rejects_renders_above_the_queue_size(mocker, context):
+    release = threading.Event()
+    mocker.patch(
+        "invoice_utils.render._render.PdfInvoiceRenderer.render",
+        side_effect=lambda *_: release.wait(5) and b"pdf",
+    )
+    inline_pool = PdfRenderPool(workers=0, max_pending=1)
+
+    async def run():
+        first = asyncio.create_task(inline_pool.render("invoice", context, "first.pdf"))
+        while inline_pool.pending == 0:
+            await asyncio.sleep(0)
+        with pytest.raises(RenderQueueFullError):
+            await inline_pool.render("invoice", context, "second.pdf")
+        release.set()
+        return await first
+
+    assert asyncio.run(run()) == b"pdf"
+    assert inline_pool.pending == 0
+
+
+def test_pool_renders_in_worker_processes(pool, context, tmp_path):
+    output_path = tmp_path / "invoice.pdf"
+
+    content = asyncio.run(pool.render("invoice", context, str(output_path), persist=True))
+
+    assert content.startswith(b"%PDF")
+    assert output_path.read_bytes() == content
+
+
+def test_pool_restarts_after_a_worker_crash(pool, context, tmp_path, caplog):
+    pool.start()
+    for process in list(pool._executor._processes.values()):
+        process.kill()
+        process.join()
+
+    content = asyncio.run(pool.render("invoice", context, str(tmp_path / "invoice.pdf")))
+
+    assert content.startswith(b"%PDF")
+    assert "PDF render worker crashed, restarting the render pool" in caplog.messages
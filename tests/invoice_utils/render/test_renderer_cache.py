@@ -0,0 +1,90 @@
+import os
+import re
+
+import pytest
+
+from invoice_utils.render import PdfInvoiceRenderer, invoice_renderer
+from invoice_utils.render._render import _TemplateCache
+
+
+@pytest.fixture
+def templates(tmp_path):
+    (tmp_path / "invoice.jinja").write_text("<p>{{ header.number }}</p>")
+    (tmp_path / "invoice.css").write_text("p { color: black; }")
+    return _TemplateCache(tmp_path)
+
+
+def _touch(path, content: str):
+    stat = path.stat()
+    path.write_text(content)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_invoice_renderer_is_shared_per_template():
+    assert invoice_renderer("invoice") is invoice_renderer("invoice")
+    assert invoice_renderer("invoice") is not invoice_renderer("invoice_ro-RO")
+    assert isinstance(invoice_renderer("invoice"), PdfInvoiceRenderer)
+
+
+def test_compiled_template_and_stylesheet_are_reused(templates):
+    assert templates.template("invoice") is templates.template("invoice")
+    assert templates.stylesheet("invoice") is templates.stylesheet("invoice")
+
+
+def test_changed_template_files_are_reloaded(templates):
+    template, stylesheet = templates.template("invoice"), templates.stylesheet("invoice")
+
+    _touch(templates.templates_path / "invoice.jinja", "<p>#{{ header.number }}</p>")
+    _touch(templates.templates_path / "invoice.css", "p { color: red; }")
+
+    assert templates.template("invoice") is not template
+    assert templates.template("invoice").render(header={"number": 7}) == "<p>#7</p>"
+    assert templates.stylesheet("invoice") is not stylesheet
+
+
+def test_render_uses_cached_assets(templates, tmp_path):
+    renderer = PdfInvoiceRenderer("invoice", templates)
+    output_path = tmp_path / "invoice.pdf"
+
+    first = renderer.render({"header": {"number": 1}}, str(output_path), persist=True)
+    second = renderer.render({"header": {"number": 1}}, str(output_path))
+
+    assert first.startswith(b"%PDF")
+    assert output_path.read_bytes() == first
+    assert len(second) > 0
+
+
+def test_render_html_skips_pdf_layout(templates, mocker):
+    html = mocker.patch("invoice_utils.render._render.weasyprint.HTML")
+    renderer = PdfInvoiceRenderer("invoice", templates)
+
+    assert renderer.render_html({"header": {"number": 3}}) == "<p>3</p>"
+    html.assert_not_called()
+
+
+def test_render_html_can_inline_the_stylesheet(tmp_path):
+    (tmp_path / "invoice.jinja").write_text("<html><head></head><body>{{ header.number }}</body></html>")
+    (tmp_path / "invoice.css").write_text("body { color: black; }\n")
+    renderer = PdfInvoiceRenderer("invoice", _TemplateCache(tmp_path))
+
+    assert renderer.render_html({"header": {"number": 3}}, inline_stylesheet=True) == (
+        "<html><head><style>\nbody { color: black; }\n</style>\n</head><body>3</body></html>"
+    )
+
+
+def test_render_many_merges_invoices_into_one_pdf(templates, tmp_path):
+    renderer = PdfInvoiceRenderer("invoice", templates)
+    output_path = tmp_path / "invoices.pdf"
+
+    content = renderer.render_many(
+        ({"header": {"number": number}} for number in range(3)), str(output_path), persist=True
+    )
+
+    assert content.startswith(b"%PDF")
+    assert len(re.findall(rb"/Type\s*/Page\b", content)) == 3
+    assert output_path.read_bytes() == content
+
+
+def test_render_many_requires_invoices(templates, tmp_path):
+    with pytest.raises(ValueError):
+        PdfInvoiceRenderer("invoice", templates).render_many([], str(tmp_path / "invoices.pdf"))
@@ -0,0 +1,140 @@
+import json
+import re
+
+import pytest
+from typer import Typer
+from typer.testing import CliRunner
+
+from invoice_utils.cli import _make_invoices
+from invoice_utils.render import PdfInvoiceRenderer
+
+INVOICE_COUNT = 8
+
+
+@pytest.fixture
+def cli():
+    app = Typer()
+    app.command()(_make_invoices)
+    return app
+
+
+@pytest.fixture
+def make_invoices(cli, resolve_path, tmp_path):
+    runner = CliRunner()
+
+    def f(invoices: list, output_dir, *args: str):
+        invoices_path = tmp_path / "batch.json"
+        invoices_path.write_text(json.dumps(invoices))
+        return runner.invoke(
+            cli, [str(invoices_path), "-t", resolve_path("basic.json"), "-o", str(output_dir), *args]
+        )
+    return f
+
+
+@pytest.fixture
+def invoices():
+    return [
+        [number, f"2024-03-{number:02}", [
+            {"text": f"item {number}-{line}", "quantity": str(line + 1), "unit_price": f"{number * 10 + line}.50"}
+            for line in range(3)
+        ]]
+        for number in range(1, INVOICE_COUNT + 1)
+    ]
+
+
+def _pages(content: bytes) -> int:
+    return len(re.findall(rb"/Type\s*/Page\b", content))
+
+
+def test_parallel_output_matches_serial(make_invoices, invoices, tmp_path):
+    serial = make_invoices(invoices, tmp_path / "serial", "-j", "1")
+    parallel = make_invoices(invoices, tmp_path / "parallel", "-j", "3")
+
+    assert serial.exit_code == 0, serial.output
+    assert parallel.exit_code == 0, parallel.output
+    serial_files = {path.name: path.read_bytes() for path in (tmp_path / "serial").iterdir()}
+    parallel_files = {path.name: path.read_bytes() for path in (tmp_path / "parallel").iterdir()}
+    assert serial_files == parallel_files
+
+
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_file_names_are_deterministic(make_invoices, invoices, tmp_path, jobs):
+    result = make_invoices(invoices, tmp_path / "out", "-j", jobs)
+
+    assert result.exit_code == 0, result.output
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == [
+        f"202403{number:02}-{number:04}-invoice.pdf" for number in range(1, INVOICE_COUNT + 1)
+    ]
+
+
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_failed_invoice_is_reported_with_exit_code_1(make_invoices, invoices, tmp_path, jobs):
+    invoices[2][2][0] = {"bogus": "field"}
+
+    result = make_invoices(invoices, tmp_path / "out", "-j", jobs)
+
+    assert result.exit_code == 1
+    assert "invoice 3: TypeError" in result.output
+    assert f"1 of {INVOICE_COUNT} invoices failed" in result.output
+    assert len(list((tmp_path / "out").iterdir())) == INVOICE_COUNT - 1
+    assert not (tmp_path / "out" / "20240303-0003-invoice.pdf").exists()
+
+
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_malformed_invoice_entries_are_reported_by_position(make_invoices, invoices, tmp_path, jobs):
+    invoices[1] = []
+    invoices[5] = {"number": 6}
+
+    result = make_invoices(invoices, tmp_path / "out", "-j", jobs)
+
+    assert result.exit_code == 1
+    assert "invoice #2: IndexError" in result.output
+    assert "invoice #6: KeyError" in result.output
+    assert f"2 of {INVOICE_COUNT} invoices failed" in result.output
+    assert len(list((tmp_path / "out").iterdir())) == INVOICE_COUNT - 2
+    assert (tmp_path / "out" / "20240303-0003-invoice.pdf").exists()
+
+
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_merge_writes_a_single_pdf(make_invoices, invoices, tmp_path, jobs):
+    result = make_invoices(invoices, tmp_path / "out", "-j", jobs, "--merge")
+
+    assert result.exit_code == 0, result.output
+    assert [path.name for path in (tmp_path / "out").iterdir()] == ["batch.pdf"]
+    content = (tmp_path / "out" / "batch.pdf").read_bytes()
+    assert content.startswith(b"%PDF")
+    assert _pages(content) >= INVOICE_COUNT
+
+
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_merge_renders_all_invoices_in_order_in_one_document(make_invoices, invoices, tmp_path, mocker, jobs):
+    render_many = mocker.spy(PdfInvoiceRenderer, "render_many")
+
+    result = make_invoices(invoices, tmp_path / "out", "-j", jobs, "--merge")
+
+    assert result.exit_code == 0, result.output
+    render_many.assert_called_once()
+    contexts = render_many.call_args.args[1]
+    assert [context["header"]["number"] for context in contexts] == list(range(1, INVOICE_COUNT + 1))
+
+
+def test_merge_with_failed_invoice_writes_no_file(make_invoices, invoices, tmp_path):
+    invoices[4][2][0] = {"bogus": "field"}
+
+    result = make_invoices(invoices, tmp_path / "out", "--merge")
+
+    assert result.exit_code == 1
+    assert "invoice 5: TypeError" in result.output
+    assert list((tmp_path / "out").iterdir()) == []
+
+
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_invalid_item_operation_is_rejected_before_rendering(make_invoices, invoices, tmp_path, jobs):
+    template = tmp_path / "template.json"
+    template.write_text(json.dumps([{"type": "item_op", "name": "vat", "operation": "^", "value": "0.19"}]))
+
+    result = make_invoices(invoices, tmp_path / "out", "-j", jobs, "-t", str(template))
+
+    assert result.exit_code == 1
+    assert "item operation 'vat' has unknown operation '^'" in result.output
+    assert not (tmp_path / "out").exists()
@@ -7,26 +7,13 @@ from jinja2 import TemplateNotFound
 
 from invoice_utils.config import DEFAULT_MAIL_SUBJECT, DEFAULT_BODY_TEMPLATE_NAME, DEFAULT_BODY_TEMPLATE_PACKAGE, \
     DEFAULT_TEMPLATES_DIRECTORY, DEFAULT_INVOICE_DIR, DEFAULT_RULE_TEMPLATE_NAME
+from invoice_utils.render import RenderQueueFullError
 
 CREATE_INVOICE_PATH = "/api/v1/invoices"
 
 MESSAGE_ARGUMENT = 2
 
 
-@pytest.fixture()
-def invoice_request_body():
-    return {
-        "header": {
-            "number": "1",
-            "timestamp": "2023-11-14T09:00:00+00:00",
-            "items": [],
-        },
-        "buyer": {"name": "a", "address": "b", "tax_info": {"id": "c"}},
-        "seller": {"name": "a", "address": "b", "tax_info": {"id": "c"}},
-        "items": [{"text": "Some t", "quantity": "2", "unit_price": "45"}],
-    }
-
-
 @pytest.fixture
 def email_invoice_request_body(invoice_request_body: dict):
     invoice_request_body["send_mail"] = True
@@ -56,8 +43,8 @@ def expected_body():
 
 @pytest.fixture
 def mock_render(mocker):
-    result = MagicMock(name="invoice_utils.api._invoices.PdfInvoiceRenderer.render")
-    mocker.patch("invoice_utils.api._invoices.PdfInvoiceRenderer.render", new=result)
+    result = MagicMock(name="invoice_utils.render._render.PdfInvoiceRenderer.render")
+    mocker.patch("invoice_utils.render._render.PdfInvoiceRenderer.render", new=result)
     result.return_value = b"test pdf content"
     return result
 
@@ -460,3 +447,14 @@ def test_generate_invoice_returns_2xx_with_invalid_default_rules_but_valid_given
     res = http.post(CREATE_INVOICE_PATH, json=email_invoice_request_body)
 
     assert res.status_code == 201
+
+
+def test_generate_invoice_returns_503_when_render_queue_is_full(http, mocker, invoice_request_body):
+    render_pool = mocker.patch("invoice_utils.api._invoices.render_pool")
+    render_pool.return_value.render.side_effect = RenderQueueFullError("64 invoices are already waiting to be rendered.")
+
+    res = http.post(CREATE_INVOICE_PATH, json=invoice_request_body)
+
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
+    assert res.json() == {"message": "64 invoices are already waiting to be rendered."}